@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Time the feed archive's queries as its history grows: adding a feed's worth
+of entries (mostly already archived), the latest N, one year and a title
+search, each answered from the SQLite indexes without fetching anything
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# support puts the scripts directory on sys.path
+import support  # noqa: F401
+import feed_archive
+import records
+
+FEED = 'https://blog.example.com/feed.xml'
+
+def synthetic_posts(count):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(count):
+        published = start - timedelta(hours=13 * i)
+        posts.append(records.Post(title=f"Post {i} about topic {i % 97}", link=f"https://blog.example.com/posts/{i}",
+                                  date=published.strftime('%B %d, %Y'), summary=f"Summary of post {i}",
+                                  published=published, guid=f"urn:post:{i}"))
+    return posts
+
+def best_time(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='archived entries')
+    parser.add_argument('--feed-entries', type=int, default=50, help='entries per feed fetch')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        posts = synthetic_posts(size)
+        with tempfile.TemporaryDirectory() as directory, \
+                feed_archive.FeedArchive(os.path.join(directory, 'archive.sqlite3')) as archive:
+            start = time.perf_counter()
+            archive.add(FEED, posts)
+            fill = time.perf_counter() - start
+
+            added, add_time = best_time(lambda: archive.add(FEED, posts[:args.feed_entries]))
+            latest, latest_time = best_time(lambda: archive.latest(FEED, records.Post, 5))
+            year, year_time = best_time(lambda: archive.by_year(FEED, records.Post, 2025))
+            found, search_time = best_time(lambda: archive.search(FEED, records.Post, 'topic 42', 20))
+
+            if added or [post.guid for post in latest] != [post.guid for post in posts[:5]]:
+                raise SystemExit("archive returned unexpected entries")
+
+            print(f"{size} entries (filled in {fill:.2f}s)")
+            print(f"  add {args.feed_entries} seen entries {add_time * 1000:7.2f}ms   latest 5 {latest_time * 1000:6.2f}ms   "
+                  f"year ({len(year)}) {year_time * 1000:6.2f}ms   search ({len(found)}) {search_time * 1000:6.2f}ms")
+
+if __name__ == "__main__":
+    main()
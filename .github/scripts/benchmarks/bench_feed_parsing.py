@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-document vs. streaming feed parsing on synthetic 5 MB feeds
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from support import MockServer, load_script, synthetic_atom_feed, synthetic_rss_feed
+
+# support puts the scripts directory on sys.path
+import feed_stream
+
+def full_document(blog, url):
+    """What the scripts used to do: read and decode everything, then ET.fromstring"""
+    content = feed_stream.fetch_feed(url)
+    root = ET.fromstring(content)
+    items = root.findall('atom:entry', blog.ns) or root.findall('.//item')
+    posts = []
+    for item in items[:blog.NUM_POSTS]:
+        if item.tag == blog.ATOM_ENTRY:
+            posts.append(blog.parse_atom_entry(item))
+        else:
+            posts.append(blog.parse_rss_item(item))
+    return posts
+
+def streaming(blog, url):
+    feed = feed_stream.open_feed(url)
+    posts, _ = feed_stream.read_feed(feed, blog.parse_rss_feed)
+    return posts
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=5 * 1024 * 1024, help='feed size in bytes')
+    parser.add_argument('--entries', type=int, default=50)
+    parser.add_argument('--bandwidth', type=float, default=20e6, help='mock server bytes per second')
+    args = parser.parse_args()
+
+    blog = load_script('update-blog-posts')
+    feeds = {
+        'atom': synthetic_atom_feed(args.entries, args.size),
+        'rss': synthetic_rss_feed(args.entries, args.size),
+    }
+    routes = [(r'/(atom|rss)', lambda handler, match: (200, {'Content-Type': 'application/xml'}, feeds[match.group(1)]))]
+
+    with MockServer(routes, bandwidth=args.bandwidth) as server:
+        for kind, body in feeds.items():
+            url = f"{server.url}/{kind}"
+            print(f"{kind}: {len(body) / 1024 / 1024:.1f} MB, {args.entries} entries")
+
+            full_posts, full_time, full_peak = measure(full_document, blog, url)
+            stream_posts, stream_time, stream_peak = measure(streaming, blog, url)
+            if full_posts != stream_posts:
+                raise SystemExit(f"{kind}: streaming parser returned different posts")
+
+            print(f"  full document  {full_time:7.3f}s  peak {full_peak / 1024 / 1024:7.1f} MB")
+            print(f"  streaming      {stream_time:7.3f}s  peak {stream_peak / 1024 / 1024:7.1f} MB"
+                  f"  (x{full_time / stream_time:.1f} faster, x{full_peak / stream_peak:.1f} less memory)")
+
+if __name__ == "__main__":
+    main()
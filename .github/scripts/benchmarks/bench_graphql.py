@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare the REST and GraphQL repository detail backends against a local stub
+server, checking that both produce the same records for format_contributions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from support import MockServer, json_response, load_script
+
+def synthetic_repo(owner, name):
+    return {
+        'name': name,
+        'full_name': f"{owner}/{name}",
+        'description': f"Synthetic repository {name}",
+        'html_url': f"https://github.com/{owner}/{name}",
+        'stars': sum(map(ord, name)) % 1000,
+        'forks': 3,
+        'language': 'Python' if len(name) % 2 else None,
+        'is_fork': False,
+        'private': name.endswith('7')
+    }
+
+def rest_repo(handler, match):
+    repo = synthetic_repo(match.group(1), match.group(2))
+    return json_response({
+        'name': repo['name'],
+        'full_name': repo['full_name'],
+        'description': repo['description'],
+        'html_url': repo['html_url'],
+        'stargazers_count': repo['stars'],
+        'forks_count': repo['forks'],
+        'language': repo['language'],
+        'fork': repo['is_fork'],
+        'private': repo['private']
+    })
+
+def graphql(handler, match):
+    variables = json.loads(handler.request_body)['variables']
+    data = {}
+    i = 0
+    while f"o{i}" in variables:
+        repo = synthetic_repo(variables[f"o{i}"], variables[f"n{i}"])
+        data[f"r{i}"] = {
+            'name': repo['name'],
+            'nameWithOwner': repo['full_name'],
+            'description': repo['description'],
+            'url': repo['html_url'],
+            'stargazerCount': repo['stars'],
+            'forkCount': repo['forks'],
+            'isFork': repo['is_fork'],
+            'isPrivate': repo['private'],
+            'primaryLanguage': {'name': repo['language']} if repo['language'] else None
+        }
+        i += 1
+    return json_response({'data': data})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repos', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='mock server latency in seconds')
+    parser.add_argument('--batch-size', type=int, default=50)
+    args = parser.parse_args()
+
+    contributions = load_script('update-contributions')
+    repo_names = [f"bench-org/repo-{i}" for i in range(args.repos)]
+    routes = [(r'/repos/([^/]+)/([^/?]+)', rest_repo), (r'/graphql', graphql)]
+
+    with MockServer(routes, latency=args.latency) as server:
+        contributions.GITHUB_API_URL = server.url
+        contributions.GITHUB_GRAPHQL_URL = f"{server.url}/graphql"
+
+        results = {}
+        for label, fetch in [
+            ('rest', lambda: contributions.fetch_repo_details(repo_names)),
+            ('graphql', lambda: contributions.fetch_repo_details_graphql(repo_names, batch_size=args.batch_size)),
+        ]:
+            server.request_count = 0
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[label] = fetch()
+            elapsed = time.perf_counter() - start
+            print(f"{label:<8} {server.request_count:>4} requests  {elapsed:7.3f}s  {len(results[label])} repos")
+
+    if results['rest'] != results['graphql']:
+        raise SystemExit("REST and GraphQL backends returned different records")
+    print("REST and GraphQL records match")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark urllib.request (one connection per request) against the pooled
+keep-alive http_client on a local HTTPS stub with a self-signed certificate
+"""
+
+import argparse
+import gzip
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+from support import MockServer, json_response
+
+# support puts the scripts directory on sys.path
+import http_client
+
+def make_certificate(directory):
+    """Create a self-signed certificate for 127.0.0.1 with the openssl CLI"""
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-keyout', key, '-out', cert, '-subj', '/CN=127.0.0.1',
+        '-addext', 'subjectAltName=IP:127.0.0.1'
+    ], check=True, capture_output=True)
+    return cert, key
+
+def payload(handler, match):
+    status, headers, body = json_response([{'id': i, 'type': 'PushEvent', 'repo': {'name': f"org/repo-{i}"}}
+                                           for i in range(100)])
+    if 'gzip' in (handler.headers.get('Accept-Encoding') or ''):
+        headers['Content-Encoding'] = 'gzip'
+        body = gzip.compress(body)
+    return status, headers, body
+
+def run(label, server, requests, fetch):
+    server.connection_count = 0
+    start = time.perf_counter()
+    for i in range(requests):
+        with fetch(f"{server.url}/events?page={i}") as response:
+            response.read()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<12} {elapsed:7.3f}s  {elapsed / requests * 1000:6.2f} ms/request  "
+          f"{server.connection_count} connections")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--connect-latency', type=float, default=0.02,
+                        help='extra seconds per new connection, standing in for handshake round trips')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(cert, key)
+        client_context = ssl.create_default_context(cafile=cert)
+        http_client.ssl_context = client_context
+
+        with MockServer([(r'/events\?page=\d+', payload)], connect_latency=args.connect_latency,
+                        ssl_context=server_context) as server:
+            print(f"{args.requests} sequential HTTPS requests, "
+                  f"{args.connect_latency * 1000:.0f} ms simulated handshake latency")
+            baseline = run('urllib', server, args.requests,
+                           lambda url: urllib.request.urlopen(url, timeout=10, context=client_context))
+            pooled = run('http_client', server, args.requests,
+                         lambda url: http_client.urlopen(url, timeout=10))
+            print(f"  speedup x{baseline / pooled:.1f}")
+            http_client.close_all()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Compare per-item dicts with the slotted record types: memory held by N
+repositories and the cost of picking and formatting the top repositories
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+from support import load_script, synthetic_repo_payload
+
+# support puts the scripts directory on sys.path
+import records
+
+def repo_dict(payload):
+    """The dict fetch_repo_detail used to build"""
+    return {
+        'name': payload.get('name', ''),
+        'full_name': payload.get('full_name', ''),
+        'description': payload.get('description', 'No description available'),
+        'html_url': payload.get('html_url', ''),
+        'stars': payload.get('stargazers_count', 0),
+        'forks': payload.get('forks_count', 0),
+        'language': payload.get('language', 'Unknown'),
+        'is_fork': payload.get('fork', False)
+    }
+
+def repo_record(payload):
+    return records.RepoInfo(
+        name=payload.get('name', ''),
+        full_name=payload.get('full_name', ''),
+        description=payload.get('description', records.NO_DESCRIPTION),
+        html_url=payload.get('html_url', ''),
+        stars=payload.get('stargazers_count', 0),
+        forks=payload.get('forks_count', 0),
+        language=payload.get('language', 'Unknown'),
+        is_fork=payload.get('fork', False)
+    )
+
+def format_dicts(repos, num_repos):
+    """format_contributions as it was: full sort, then .get() and cleanup per repo"""
+    sorted_repos = sorted(repos, key=lambda x: x.get('stars', 0), reverse=True)
+    markdown = "## Open Source Contributions\n\n"
+    markdown += "Here are a few repos I have contributed to:\n\n"
+    for repo in sorted_repos[:num_repos]:
+        full_name = repo.get('full_name', 'Unknown')
+        html_url = repo.get('html_url', '#')
+        stars = repo.get('stars', 0)
+        language = repo.get('language', 'Various')
+        if not html_url.startswith('https://github.com/'):
+            continue
+        language = language if language else 'Various'
+        markdown += f"📦 **[{full_name}]({html_url})** "
+        markdown += f"(★ {stars:,} | {language})\n"
+        description = repo.get('description', 'No description available')
+        if description:
+            description = description.replace('\n', ' ').replace('\r', ' ')
+            if len(description) > 120:
+                description = description[:120].rsplit(' ', 1)[0] + '...'
+        else:
+            description = 'No description available'
+        markdown += f"   {description}\n\n"
+    return markdown
+
+def build(factory, payloads):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    items = [factory(payload) for payload in payloads]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, after - before
+
+def best_time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repos', type=int, default=20000, help='number of repositories')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    contributions = load_script('update-contributions')
+    payloads = [synthetic_repo_payload('bench-org', f"repo-{i}") for i in range(args.repos)]
+
+    dicts, dict_bytes = build(repo_dict, payloads)
+    repos, record_bytes = build(repo_record, payloads)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        old, old_time = best_time(lambda: format_dicts(dicts, contributions.NUM_REPOS), args.repeat)
+        new, new_time = best_time(lambda: contributions.format_contributions(repos), args.repeat)
+    if old != new:
+        raise SystemExit("Records produce different markdown than dicts")
+
+    print(f"{args.repos} repositories")
+    print(f"  dicts     {dict_bytes / 1024 / 1024:7.2f} MB  top {contributions.NUM_REPOS} + format "
+          f"{old_time * 1000:7.2f}ms")
+    print(f"  records   {record_bytes / 1024 / 1024:7.2f} MB  top {contributions.NUM_REPOS} + format "
+          f"{new_time * 1000:7.2f}ms  (x{dict_bytes / record_bytes:.1f} less memory, "
+          f"x{old_time / new_time:.1f} faster)")
+
+if __name__ == "__main__":
+    main()
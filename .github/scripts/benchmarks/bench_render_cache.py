@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Time rendering the blog and videos sections of many profiles from their
+feed bodies, as update-profiles does, on a day where most feeds did not
+change: without the render cache, with it from a fresh process that reads
+yesterday's sections from disk, and again from memory
+
+Also compares the old += formatters with the list-join ones on the parsed
+records. Every variant is checked to produce the same markdown.
+"""
+
+import argparse
+import tempfile
+import time
+
+from support import load_script, synthetic_rss_feed, synthetic_youtube_feed
+
+# support puts the scripts directory on sys.path
+import render_cache
+
+def old_blog_roll(blog, posts):
+    """format_blog_roll before the list-join builder"""
+    markdown = "## Latest from My Blog\n\n"
+    for post in posts:
+        markdown += blog.format_post(post)
+    return markdown
+
+def old_video_list(youtube, videos, url, channel_name):
+    """format_video_list before the list-join builder"""
+    markdown = f"## Latest Videos from {channel_name}\n\n"
+    for video in videos:
+        markdown += youtube.format_video(video)
+    markdown += f"[View all videos]({url})\n"
+    return markdown
+
+def profile_feeds(profile, day, blog_feed, video_feed):
+    """A profile's blog and video feed bodies; a new day changes one entry title"""
+    marker = f"p{profile}d{day}-".encode('utf-8')
+    return blog_feed.replace(b'<title>Post 0<', b'<title>Post ' + marker + b'0<'), \
+        video_feed.replace(b'<title>Video 0<', b'<title>Video ' + marker + b'0<')
+
+def render_all(profiles, render):
+    sections = []
+    for number, (blog_body, video_body) in enumerate(profiles):
+        sections.extend(render(number, blog_body, video_body))
+    return sections
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profiles', type=int, default=200)
+    parser.add_argument('--changed', type=float, default=0.1, help='share of profiles with a changed feed today')
+    parser.add_argument('--posts', type=int, default=10, help='entries per blog feed')
+    parser.add_argument('--feed-bytes', type=int, default=64 * 1024, help='size of each blog feed')
+    parser.add_argument('--videos', type=int, default=15, help='entries per video feed')
+    args = parser.parse_args()
+
+    blog = load_script('update-blog-posts')
+    youtube = load_script('update-youtube-videos')
+    profiles_script = load_script('update-profiles')
+    blog_feed = synthetic_rss_feed(args.posts, args.feed_bytes)
+    video_feed = synthetic_youtube_feed(args.videos)
+
+    changed_every = max(1, round(1 / args.changed)) if args.changed else args.profiles + 1
+    yesterday = [profile_feeds(p, 0, blog_feed, video_feed) for p in range(args.profiles)]
+    today = [profile_feeds(p, 1 if p % changed_every == 0 else 0, blog_feed, video_feed)
+             for p in range(args.profiles)]
+
+    def url(number):
+        return f"https://www.youtube.com/playlist?list=p{number}"
+
+    def uncached(number, blog_body, video_body):
+        return [profiles_script.render_blog([blog_body]),
+                profiles_script.render_videos([video_body], url(number), 'Channel')]
+
+    def through(cache):
+        def render(number, blog_body, video_body):
+            return [cache.render(blog.SECTION, blog.RENDER_SOURCES + (profiles_script.__file__,), [blog_body],
+                                 profiles_script.render_blog),
+                    cache.render(youtube.SECTION, youtube.RENDER_SOURCES + (profiles_script.__file__,), [video_body],
+                                 profiles_script.render_videos, url(number), 'Channel')]
+        return render
+
+    plain, plain_time = timed(lambda: render_all(today, uncached))
+
+    with tempfile.TemporaryDirectory() as directory:
+        render_all(yesterday, through(render_cache.RenderCache(directory, max_entries=4 * args.profiles)))
+        cache = render_cache.RenderCache(directory, max_entries=4 * args.profiles)
+        cold, cold_time = timed(lambda: render_all(today, through(cache)))
+        cold_stats = cache.stats()
+        warm, warm_time = timed(lambda: render_all(today, through(cache)))
+    if not plain == cold == warm:
+        raise SystemExit("cached sections differ from rendered ones")
+
+    print(f"{args.profiles} profiles x 2 feed sections, {args.changed:.0%} changed since yesterday")
+    print(f"  parse + format        {plain_time * 1000:8.2f}ms")
+    print(f"  cache, from disk      {cold_time * 1000:8.2f}ms (x{plain_time / cold_time:.1f})  "
+          f"{cold_stats['hits']} hits, {cold_stats['misses']} misses")
+    print(f"  cache, in memory      {warm_time * 1000:8.2f}ms (x{plain_time / warm_time:.1f})")
+
+    posts = blog.parse_rss_feed(blog_feed)
+    videos = youtube.parse_youtube_feed(video_feed)
+    repeat = 20000
+    for label, old, new in [('blog', lambda: old_blog_roll(blog, posts), lambda: blog.format_blog_roll(posts)),
+                            ('videos', lambda: old_video_list(youtube, videos, url(0), 'Channel'),
+                             lambda: youtube.format_video_list(videos, url(0), 'Channel'))]:
+        if old() != new():
+            raise SystemExit(f"{label}: list-join formatter renders different markdown")
+        _, old_time = timed(lambda: [old() for _ in range(repeat)])
+        _, new_time = timed(lambda: [new() for _ in range(repeat)])
+        print(f"  {label:<7} format: += {old_time / repeat * 1e6:5.2f}us   list-join {new_time / repeat * 1e6:5.2f}us")
+
+if __name__ == "__main__":
+    main()
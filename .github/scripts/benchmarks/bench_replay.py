@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Record the fetch stage of all three scripts (blog feed, YouTube feed,
+GitHub contributions) against the mock server into a cassette, stop the
+server, and replay it offline: as fast as possible, with injected latency
+and a bandwidth cap for one and several detail workers, and with injected
+502 and 403 errors, twice with the same seed, to show the retry paths are
+taken the same way each time
+
+Every fault-free replay is checked to return what the recorded run returned,
+and the two runs with injected errors to return the same as each other and
+to wait the same backoff before their retries.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from support import MockServer, github_api_routes, load_script, synthetic_rss_feed, synthetic_youtube_feed
+
+# support puts the scripts directory on sys.path
+import deadline
+import feed_stream
+import http_replay
+import metrics
+
+GITHUB_OWNER = 'bench-org'
+GITHUB_USER = 'bench-user'
+
+def run_pipeline(blog, youtube, contributions, base_url):
+    """Fetch everything the three scripts need; returns (feeds, repos, seconds, metrics snapshot)"""
+    metrics.reset()
+    deadline.start()
+    start = time.perf_counter()
+    # The scripts' progress output is not interesting here
+    with contextlib.redirect_stdout(io.StringIO()):
+        feeds = [feed_stream.fetch_feed(f"{base_url}/blog/feed.xml"),
+                 feed_stream.fetch_feed(f"{base_url}/feeds/videos.xml?playlist_id=bench")]
+        contributions.GITHUB_API_URL = base_url
+        repos = contributions.collect_repos(GITHUB_USER, index_path='')
+    return feeds, repos, time.perf_counter() - start, metrics.snapshot()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repos', type=int, default=60)
+    parser.add_argument('--events', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.03, help='injected latency in seconds')
+    parser.add_argument('--bandwidth', type=float, default=2 * 1024 * 1024, help='injected bytes per second')
+    parser.add_argument('--error-rate', type=float, default=0.2)
+    parser.add_argument('--seed', default='7')
+    args = parser.parse_args()
+
+    blog = load_script('update-blog-posts')
+    youtube = load_script('update-youtube-videos')
+    contributions = load_script('update-contributions')
+    routes = [
+        (r'/blog/feed\.xml', lambda handler, match: (200, {'Content-Type': 'application/xml'},
+                                                     synthetic_rss_feed(20, 256 * 1024))),
+        (r'/feeds/videos\.xml\?playlist_id=.*', lambda handler, match: (200, {'Content-Type': 'application/atom+xml'},
+                                                                        synthetic_youtube_feed(15))),
+    ] + github_api_routes(args.repos, args.events, contributions.EVENTS_PER_PAGE, GITHUB_OWNER)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cassette = os.path.join(directory, 'cassette.jsonl.gz')
+        with MockServer(routes) as server:
+            base_url = server.url
+            http_replay.set_transport(http_replay.Transport('record', cassette))
+            feeds, repos, seconds, snapshot = run_pipeline(blog, youtube, contributions, base_url)
+            requests = server.request_count
+        counters = snapshot['counters']
+        print(f"recorded {counters.get('replay.recorded', 0)} responses ({requests} requests to the server) "
+              f"in {seconds:.3f}s, cassette {os.path.getsize(cassette) / 1024:.0f}KB")
+
+        def replay(label, **faults):
+            http_replay.set_transport(http_replay.Transport('replay', cassette, **faults))
+            result = run_pipeline(blog, youtube, contributions, base_url)
+            if not faults.get('error_rate') and result[:2] != (feeds, repos):
+                raise SystemExit(f"{label}: replay returned different data")
+            counters = result[3]['counters']
+            backoff = result[3]['stages'].get('github.backoff', {}).get('seconds', 0)
+            print(f"  {label:<40} {result[2]:7.3f}s  served {counters.get('replay.served', 0):3}  "
+                  f"injected {counters.get('replay.injected_errors', 0):2}  retries {counters.get('github.retries', 0):2}  "
+                  f"backoff {backoff:.3f}s")
+            return result[:2], counters, backoff
+
+        print("replay (no network)")
+        replay('as fast as possible')
+        for workers in (1, contributions.DETAIL_WORKERS):
+            contributions.DETAIL_WORKERS = workers
+            replay(f"{args.latency * 1000:.0f}ms latency, {args.bandwidth / 1024 / 1024:.0f}MB/s, "
+                   f"{workers} detail workers", latency=args.latency, bandwidth=args.bandwidth)
+
+        runs = [replay(f"{args.error_rate:.0%} errors (502, 403), seed {args.seed}", error_rate=args.error_rate,
+                       error_statuses=[502, 403], seed=args.seed, retry_after='0') for _ in range(2)]
+        keys = ('replay.injected_errors', 'github.retries')
+        (first, first_counters, first_backoff), (second, second_counters, second_backoff) = runs
+        if first != second or [first_counters.get(key) for key in keys] != [second_counters.get(key) for key in keys]:
+            raise SystemExit("the same seed injected different errors")
+        # Summed in thread order, so compared rounded
+        if round(first_backoff, 6) != round(second_backoff, 6):
+            raise SystemExit(f"the same seed waited {first_backoff:.3f}s and {second_backoff:.3f}s before retrying")
+        http_replay.set_transport(None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential vs. concurrent fetch_repo_details against a mock GitHub API
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from support import MockServer, json_response, load_script
+
+def repo_payload(handler, match):
+    owner, name = match.group(1), match.group(2)
+    return json_response({
+        'name': name,
+        'full_name': f"{owner}/{name}",
+        'description': f"Synthetic repository {name}",
+        'html_url': f"https://github.com/{owner}/{name}",
+        'stargazers_count': sum(map(ord, name)) % 1000,
+        'forks_count': 3,
+        'language': 'Python',
+        'fork': False,
+        'private': False
+    }, headers={'X-RateLimit-Remaining': '4999'})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repos', type=int, default=100, help='number of repositories to fetch')
+    parser.add_argument('--latency', type=float, default=0.05, help='mock server latency in seconds')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    contributions = load_script('update-contributions')
+    repo_names = [f"bench-org/repo-{i}" for i in range(args.repos)]
+
+    with MockServer([(r'/repos/([^/]+)/([^/?]+)', repo_payload)], latency=args.latency) as server:
+        contributions.GITHUB_API_URL = server.url
+
+        print(f"{args.repos} repos, {args.latency * 1000:.0f} ms simulated latency")
+        baseline = None
+        expected = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                repos = contributions.fetch_repo_details(repo_names, max_workers=workers)
+            elapsed = time.perf_counter() - start
+
+            names = [repo.full_name for repo in repos]
+            if expected is None:
+                expected = names
+            elif names != expected:
+                raise SystemExit(f"Output order differs with {workers} workers")
+
+            baseline = baseline or elapsed
+            print(f"  workers={workers:<3} {elapsed:7.3f}s  speedup x{baseline / elapsed:.1f}")
+
+if __name__ == "__main__":
+    main()
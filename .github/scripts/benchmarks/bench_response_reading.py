@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare peak memory of reading a response with read() + decode() against
+read_body() handing its buffer straight to the parser, for a large JSON
+payload and a full feed, and check that an oversize response is refused
+before its body is downloaded
+
+Peaks are measured up to the point the body is ready for the parser; both
+variants parse to the same result, which is checked separately.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from support import MockServer, load_script, synthetic_atom_feed
+
+# support puts the scripts directory on sys.path
+import feed_stream
+import http_client
+
+def old_json(url):
+    """The old github_request: bytes copied out of the read buffer, then decoded to str"""
+    with http_client.urlopen(url) as response:
+        return response.read(10 * 1024 * 1024).decode('utf-8')
+
+def new_json(url):
+    with http_client.urlopen(url, limit=10 * 1024 * 1024) as response:
+        return response.read_body()
+
+def old_feed(url):
+    """The old fetch_rss_feed: chunks kept in a list, joined, then decoded to str"""
+    with http_client.urlopen(url) as response:
+        chunks = list(feed_stream.iter_chunks(response))
+    return b''.join(chunks).decode('utf-8')
+
+def measure(fn):
+    """Return (result, seconds, tracemalloc peak) of calling fn"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--json-bytes', type=int, default=8 * 1024 * 1024, help='size of the JSON payload')
+    parser.add_argument('--feed-bytes', type=int, default=4 * 1024 * 1024, help='size of the feed')
+    args = parser.parse_args()
+
+    blog = load_script('update-blog-posts')
+    items = args.json_bytes // 120
+    payload = json.dumps([{'id': i, 'name': f"repo-{i}", 'description': 'x' * 80} for i in range(items)]).encode()
+    feed = synthetic_atom_feed(50, args.feed_bytes)
+    feed = feed.encode('utf-8') if isinstance(feed, str) else feed
+
+    routes = [
+        (r'/payload\.json', lambda handler, match: (200, {'Content-Type': 'application/json'}, payload)),
+        (r'/feed\.xml', lambda handler, match: (200, {'Content-Type': 'application/atom+xml'}, feed)),
+    ]
+    with MockServer(routes) as server:
+        for label, old, new, parse, size in [
+            ('json', lambda: old_json(f"{server.url}/payload.json"),
+             lambda: new_json(f"{server.url}/payload.json"), json.loads, len(payload)),
+            ('feed', lambda: old_feed(f"{server.url}/feed.xml"),
+             lambda: feed_stream.fetch_feed(f"{server.url}/feed.xml"),
+             lambda body: ET.tostring(ET.fromstring(body)), len(feed)),
+        ]:
+            old_body, old_time, old_peak = measure(old)
+            new_body, new_time, new_peak = measure(new)
+            if parse(old_body) != parse(new_body):
+                raise SystemExit(f"{label}: bodies parse differently")
+
+            print(f"{label} ({size / 1024 / 1024:.1f} MB)")
+            print(f"  read + decode  {old_time:6.3f}s  read peak {old_peak / 1024 / 1024:6.1f} MB")
+            print(f"  read_body      {new_time:6.3f}s  read peak {new_peak / 1024 / 1024:6.1f} MB  "
+                  f"(x{old_peak / new_peak:.1f} less memory)")
+
+        received = server.request_count
+        start = time.perf_counter()
+        try:
+            with http_client.urlopen(f"{server.url}/payload.json", limit=1024 * 1024) as response:
+                response.read_body()
+            raise SystemExit("oversize response was not refused")
+        except http_client.ResponseTooLarge as e:
+            print(f"oversize: refused in {(time.perf_counter() - start) * 1000:.1f}ms ({e})")
+        assert server.request_count == received + 1
+
+if __name__ == "__main__":
+    main()
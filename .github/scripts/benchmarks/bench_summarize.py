@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the HTML summarizer on realistic full-content posts
+"""
+
+import argparse
+import re
+import timeit
+
+from support import load_script
+
+def legacy_extract_summary(html_text, max_length=150):
+    """The replace/regex summarizer the blog script used before text_extract"""
+    if not html_text:
+        return ''
+
+    html_text = html_text[:10000]
+
+    clean_text = html_text
+    for tag in ['<br>', '<br/>', '<br />', '</p>', '</div>', '</li>']:
+        clean_text = clean_text.replace(tag, ' ')
+
+    clean_text = re.sub(r'<[^>]{1,100}>', '', clean_text)
+    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+
+    if len(clean_text) > max_length:
+        clean_text = clean_text[:max_length].rsplit(' ', 1)[0] + '...'
+    return clean_text
+
+def full_content_post(paragraphs=60):
+    """A content:encoded body shaped like a static-site blog post"""
+    parts = [
+        '<style>.post pre { background: #f6f8fa; }</style>\n',
+        '<figure class="hero"><img src="/assets/hero.webp" alt="OpenSpec workflow" '
+        'style="width: 100%; max-width: 960px; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.15);"/>'
+        '<figcaption>Spec-driven development &mdash; the workflow</figcaption></figure>\n',
+    ]
+    for i in range(paragraphs):
+        parts.append(
+            f'<h2 id="step-{i}">Step {i}: capture the intent</h2>\n'
+            '<p>Spec-driven development keeps the <strong>intent</strong> of a change next to its code, '
+            'so reviewers &amp; coding agents can check the implementation against it. See '
+            '<a href="https://github.com/Fission-AI/OpenSpec" target="_blank" rel="noopener">OpenSpec</a> '
+            'for the tooling&nbsp;&ndash; it works with <code>opencode</code> and friends.</p>\n'
+            '<pre><code class="language-bash">openspec propose add-dark-mode\nopenspec apply</code></pre>\n'
+            '<ul><li>Proposal</li><li>Design</li><li>Tasks</li></ul>\n'
+        )
+    parts.append('<script>window.analytics && window.analytics.track("read");</script>\n')
+    return ''.join(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--max-length', type=int, default=150)
+    args = parser.parse_args()
+
+    blog = load_script('update-blog-posts')
+    posts = [full_content_post(40 + i % 40) for i in range(args.posts)]
+    average_kb = sum(map(len, posts)) / len(posts) / 1024
+    print(f"{args.posts} posts, {average_kb:.0f} KB average, max_length={args.max_length}")
+    print(f"  legacy    {legacy_extract_summary(posts[0], args.max_length)!r}")
+    print(f"  current   {blog.extract_summary(posts[0], args.max_length)!r}")
+
+    for label, summarize in [('legacy', legacy_extract_summary), ('current', blog.extract_summary)]:
+        seconds = min(timeit.repeat(lambda: [summarize(post, args.max_length) for post in posts],
+                                    number=1, repeat=5))
+        print(f"  {label:<8} {seconds / args.posts * 1e6:8.1f} us/post")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compare the old try-RFC-2822-then-ISO date parsing with timestamps.FeedDates
+over Atom and RSS feeds with thousands of entries
+
+The cold run parses every timestamp for the first time; the warm run parses
+the same feed again and hits the LRU cache, as long as the feed has no more
+entries than timestamps.CACHE_SIZE.
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+# support puts the scripts directory on sys.path
+import support  # noqa: F401
+import timestamps
+
+def old_parse_date(date_string):
+    """The blog script's parse_date before the shared parser"""
+    try:
+        date_obj = datetime.strptime(date_string, '%a, %d %b %Y %H:%M:%S %z')
+        return date_obj.strftime('%B %d, %Y')
+    except Exception:
+        try:
+            date_obj = datetime.fromisoformat(date_string.replace('Z', '+00:00'))
+            return date_obj.strftime('%B %d, %Y')
+        except Exception:
+            return date_string
+
+def new_parse_dates(texts):
+    dates = timestamps.FeedDates()
+    return [timestamps.display(dates.parse(text), text) for text in texts]
+
+def feed_timestamps(feed_format, entries):
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    values = [start + timedelta(hours=7 * i, seconds=i) for i in range(entries)]
+    if feed_format == 'atom':
+        return [value.strftime('%Y-%m-%dT%H:%M:%SZ') for value in values]
+    return [value.strftime('%a, %d %b %Y %H:%M:%S +0000') for value in values]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=3000, help='timestamps per feed')
+    args = parser.parse_args()
+
+    print(f"{args.entries} timestamps per feed, cache size {timestamps.CACHE_SIZE}")
+    for feed_format in ('atom', 'rss'):
+        texts = feed_timestamps(feed_format, args.entries)
+        timestamps.parse_rfc2822.cache_clear()
+        timestamps.parse_iso8601.cache_clear()
+
+        old, old_time = timed(lambda: [old_parse_date(text) for text in texts])
+        cold, cold_time = timed(lambda: new_parse_dates(texts))
+        warm, warm_time = timed(lambda: new_parse_dates(texts))
+        if not old == cold == warm:
+            raise SystemExit(f"{feed_format}: parsed dates differ")
+
+        print(f"  {feed_format:<5} old {old_time * 1000:7.2f}ms  cold {cold_time * 1000:7.2f}ms "
+              f"(x{old_time / cold_time:.1f})  warm {warm_time * 1000:7.2f}ms (x{old_time / warm_time:.1f})")
+        for name, info in timestamps.cache_info().items():
+            if info.currsize:
+                print(f"        {name} cache: {info.hits} hits, {info.misses} misses, "
+                      f"{info.currsize}/{info.maxsize} entries")
+
+if __name__ == "__main__":
+    main()
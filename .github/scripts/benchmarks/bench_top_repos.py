@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compare fetching every repository's details with the star-ordered top-K
+selection, counting the requests each one sends to a mock GitHub API
+
+Three runs of each mode: no token (every repository is a candidate), a token
+(one batched GraphQL star lookup bounds every candidate) and a stale
+contribution index (cached star counts bound the candidates).
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from support import MockServer, github_api_routes, load_script
+
+OWNER = 'bench-org'
+
+def run(contributions, server, selection, token, index_path):
+    contributions.DETAIL_SELECTION = selection
+    contributions.GITHUB_TOKEN = token
+    before = server.request_count
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        repos = contributions.collect_repos('bench-user', index_path=index_path)
+    elapsed = time.perf_counter() - start
+    return contributions.format_contributions(repos), server.request_count - before, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repos', type=int, default=300, help='contributed repositories')
+    parser.add_argument('--latency', type=float, default=0.02, help='mock server latency in seconds')
+    args = parser.parse_args()
+
+    os.environ['HTTP_CACHE'] = '0'
+    contributions = load_script('update-contributions')
+    routes = github_api_routes(args.repos, args.repos, contributions.EVENTS_PER_PAGE, OWNER)
+
+    with MockServer(routes, latency=args.latency) as server, tempfile.TemporaryDirectory() as directory:
+        contributions.GITHUB_API_URL = server.url
+        contributions.GITHUB_GRAPHQL_URL = f"{server.url}/graphql"
+        contributions.DETAILS_MAX_AGE_DAYS = 0
+
+        print(f"{args.repos} repositories, {args.latency * 1000:.0f} ms simulated latency")
+        for label, token, indexed in [('no token', '', False), ('token', 'bench-token', False),
+                                      ('stale index', '', True)]:
+            results = {}
+            for selection in ('all', 'top-k'):
+                index_path = ''
+                if indexed:
+                    # Fill the index with every repository's details, then time a run where all are stale
+                    index_path = os.path.join(directory, f"index-{selection}.json")
+                    run(contributions, server, 'all', '', index_path)
+                results[selection] = run(contributions, server, selection, token, index_path)
+
+            if results['all'][0] != results['top-k'][0]:
+                raise SystemExit(f"{label}: top-k selection renders a different section")
+            for selection, (_, requests, elapsed) in results.items():
+                print(f"  {label:<12} {selection:<6} {requests:5d} requests  {elapsed:7.3f}s")
+
+if __name__ == "__main__":
+    main()
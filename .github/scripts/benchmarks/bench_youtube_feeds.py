@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare fetching several YouTube playlist feeds one after another and taking
+their first videos in feed order with fetching them concurrently and merging
+them by publish date, for playlists that share videos and list them out of
+date order
+
+The merged list is checked against sorting every unique video by date.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from support import MockServer, load_script
+
+# support puts the scripts directory on sys.path
+import feed_stream
+import records
+
+def playlist_feed(playlist, video_ids, start):
+    """Atom feed of a playlist listing video_ids in the given (playlist) order"""
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" '
+             'xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">\n'
+             f"<title>Playlist {playlist}</title>\n"]
+    for video_id in video_ids:
+        published = start - timedelta(hours=9 * video_id)
+        parts.append(
+            f"<entry><id>yt:video:vid{video_id:08d}</id><yt:videoId>vid{video_id:08d}</yt:videoId>"
+            f"<title>Video {video_id}</title>"
+            f'<link rel="alternate" href="https://www.youtube.com/watch?v=vid{video_id:08d}"/>'
+            f"<published>{published.isoformat()}</published>"
+            f"<media:group><media:description>Video {video_id} of playlist {playlist}</media:description>"
+            "</media:group></entry>\n"
+        )
+    parts.append('</feed>\n')
+    return ''.join(parts).encode('utf-8')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--playlists', type=int, default=6, help='playlist feeds')
+    parser.add_argument('--entries', type=int, default=15, help='entries per feed')
+    parser.add_argument('--overlap', type=int, default=5, help='videos each playlist shares with the next')
+    parser.add_argument('--latency', type=float, default=0.2, help='simulated round trip in seconds')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    youtube = load_script('update-youtube-videos')
+    rng = random.Random(args.seed)
+    start = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    step = args.entries - args.overlap
+    feeds = {}
+    for playlist in range(args.playlists):
+        video_ids = list(range(playlist * step, playlist * step + args.entries))
+        rng.shuffle(video_ids)
+        feeds[f"bench{playlist}"] = playlist_feed(playlist, video_ids, start)
+
+    routes = [(r'/feeds/videos\.xml\?playlist_id=(\w+)',
+               lambda handler, match: (200, {'Content-Type': 'application/atom+xml'}, feeds[match.group(1)]))]
+    with MockServer(routes, latency=args.latency) as server:
+        youtube.FEED_URL = f"{server.url}/feeds/videos.xml?playlist_id={{playlist_id}}"
+        urls = youtube.feed_urls(list(feeds), [])
+
+        def fetch_and_parse(max_workers):
+            opened = youtube.map_feeds(feed_stream.open_feed, [(url,) for url in urls], max_workers)
+            parsed = youtube.map_feeds(youtube.read_videos, zip(urls, opened), max_workers)
+            return [videos for videos, _ in parsed]
+
+        began = time.perf_counter()
+        sequential = fetch_and_parse(1)
+        old = [video for videos in sequential for video in videos][:youtube.NUM_VIDEOS]
+        old_time = time.perf_counter() - began
+
+        began = time.perf_counter()
+        new = youtube.latest_videos(fetch_and_parse(len(urls)))
+        new_time = time.perf_counter() - began
+
+    unique = {video.guid: video for videos in sequential for video in videos}
+    expected = sorted(unique.values(), key=records.published_key, reverse=True)[:youtube.NUM_VIDEOS]
+    if [video.guid for video in new] != [video.guid for video in expected]:
+        raise SystemExit("merged videos are not the newest unique videos")
+
+    newest = {video.guid for video in expected}
+    print(f"{args.playlists} playlists x {args.entries} entries, {len(unique)} unique videos, "
+          f"{args.latency * 1000:.0f}ms latency")
+    print(f"  one at a time, feed order  {old_time:6.3f}s  "
+          f"{len(newest & {video.guid for video in old})}/{youtube.NUM_VIDEOS} of the newest videos")
+    print(f"  concurrent + merge         {new_time:6.3f}s  "
+          f"{youtube.NUM_VIDEOS}/{youtube.NUM_VIDEOS} of the newest videos (x{old_time / new_time:.1f})")
+
+if __name__ == "__main__":
+    main()
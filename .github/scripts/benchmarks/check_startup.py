@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Check the cold-start cost of the update scripts with python -X importtime
+
+Each script is imported in a fresh interpreter and the cumulative import time
+of everything it pulls in is compared against a budget. The XML, HTML, HTTP
+and TLS stacks must not be imported by loading a script, and the feed
+scripts must not import them either when a run exits early because the
+cached feed and the fingerprint are both unchanged.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from support import SCRIPTS_DIR
+
+# support puts the scripts directory on sys.path
+import fingerprint
+import http_cache
+
+SCRIPTS = ['update-blog-posts', 'update-youtube-videos', 'update-contributions']
+FEED_SCRIPTS = ['update-blog-posts', 'update-youtube-videos']
+# Modules only the network, parsing and rendering paths need
+DEFERRED_MODULES = ['xml.etree.ElementTree', 'pyexpat', 'html.parser', 'ssl', 'http.client',
+                    'urllib.request', 'email.parser', 'tempfile']
+
+LOAD_SCRIPT = """
+import json, sys
+sys.path.insert(0, {scripts_dir!r})
+from script_loader import load_script
+module = load_script({name!r})
+{run}
+print(json.dumps(sorted(sys.modules)))
+"""
+
+def run_script(name, run='', env=None, cwd=None, importtime=False):
+    """Load (and optionally run) a script in a fresh interpreter; return (modules, stderr)"""
+    code = LOAD_SCRIPT.format(scripts_dir=SCRIPTS_DIR, name=name, run=run)
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    completed = subprocess.run(command, capture_output=True, text=True, env=env, cwd=cwd, check=True)
+    return set(json.loads(completed.stdout.strip().splitlines()[-1])), completed.stderr
+
+def import_time_ms(stderr):
+    """Sum the cumulative time of the top-level imports in -X importtime output"""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, package = line[len('import time:'):].split('|')
+        # Nested imports are indented below the import that triggered them
+        if not package[1:].startswith(' '):
+            total += int(cumulative)
+    return total / 1000
+
+def baseline_import_time_ms():
+    """Import time of the interpreter itself, subtracted from every measurement"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'],
+                               capture_output=True, text=True, check=True)
+    return import_time_ms(completed.stderr)
+
+def check_early_exit(name, directory):
+    """Return the deferred modules imported by a run that exits on an unchanged feed"""
+    code = LOAD_SCRIPT.format(scripts_dir=SCRIPTS_DIR, name=name,
+                              run="print(json.dumps([module.RSS_URL, module.SECTION, module.RENDER_SOURCES]))")
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    url, section, sources = json.loads(completed.stdout.splitlines()[-2])
+
+    body = b'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"></feed>'
+    cache = http_cache.HTTPCache(os.path.join(directory, '.cache', 'http'), ttl=3600)
+    cache.store(url, body, {'ETag': '"startup-check"'})
+    cache.flush()
+    state = {section: fingerprint.compute(body, *sources)}
+    with open(os.path.join(directory, '.cache', 'fingerprints.json'), 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+    env = dict(os.environ, HTTP_CACHE='1', HTTP_CACHE_TTL='3600', SKIP_UNCHANGED='1', METRICS_PATH='')
+    env.pop('HTTP_CACHE_DIR', None)
+    env.pop('FINGERPRINT_STATE', None)
+    modules, _ = run_script(name, run="result = module.build_section()\n"
+                                      "assert result[0] is sys.modules['fingerprint'].UNCHANGED, result",
+                            env=env, cwd=directory)
+    return sorted(module for module in DEFERRED_MODULES if module in modules)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', '40')),
+                        help='allowed import time per script on top of the bare interpreter')
+    parser.add_argument('--runs', type=int, default=3, help='measurements per script; the best is used')
+    args = parser.parse_args()
+
+    interpreter_ms = min(baseline_import_time_ms() for _ in range(args.runs))
+    failures = []
+
+    print(f"Interpreter startup imports: {interpreter_ms:.1f}ms (subtracted below)")
+    for name in SCRIPTS:
+        times = []
+        for _ in range(args.runs):
+            modules, stderr = run_script(name, importtime=True)
+            times.append(import_time_ms(stderr) - interpreter_ms)
+        elapsed = min(times)
+
+        deferred = sorted(module for module in DEFERRED_MODULES if module in modules)
+        status = 'ok' if elapsed <= args.budget_ms and not deferred else 'FAIL'
+        print(f"  {name:<36} {elapsed:7.1f}ms  {status}")
+        if elapsed > args.budget_ms:
+            failures.append(f"{name}: imports take {elapsed:.1f}ms, budget {args.budget_ms:.1f}ms")
+        if deferred:
+            failures.append(f"{name}: loading imports {', '.join(deferred)}")
+
+    for name in FEED_SCRIPTS:
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, '.cache'))
+            deferred = check_early_exit(name, directory)
+        print(f"  {name + ' (unchanged)':<36} {'FAIL' if deferred else 'ok':>13}")
+        if deferred:
+            failures.append(f"{name}: unchanged run imports {', '.join(deferred)}")
+
+    if failures:
+        print(f"\n{len(failures)} startup checks failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nStartup checks passed")
+
+if __name__ == "__main__":
+    main()
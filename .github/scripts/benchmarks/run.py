@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Stage-by-stage benchmark of the three update scripts against a local mock server
+
+The blog feed, the YouTube playlist feed and the GitHub events, search and
+repos endpoints are served locally with configurable size and latency. For
+each script the fetch, parse, summarize, format and README splice stages are
+timed separately (best of --repeat runs) and reported with their throughput
+and tracemalloc peak. Contributions have no summarize stage; their parse
+stage is decode_json over the API responses the fetch stage received.
+
+    python run.py --save-baseline baseline.json   # record a baseline
+    python run.py --check baseline.json           # fail on a regression
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from support import (MockServer, github_api_routes, load_script, synthetic_atom_feed,
+                     synthetic_rss_feed, synthetic_youtube_feed)
+
+# support puts the scripts directory on sys.path
+import feed_stream
+import readme_sections
+
+README_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))), 'README.md')
+GITHUB_OWNER = 'bench-org'
+GITHUB_USER = 'bench-user'
+
+@contextlib.contextmanager
+def patched(module, name, value):
+    """Temporarily replace module.name"""
+    original = getattr(module, name)
+    setattr(module, name, value)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+def keep_raw(text, max_length=150):
+    """Stand-in summarizer so the parse stage can be timed without summarizing"""
+    return text
+
+def measure(fn, repeat):
+    """Return (result, best wall time, tracemalloc peak) of calling fn"""
+    best = None
+    result = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return result, best, peak
+
+class StageRecorder:
+    """Collect stage timings as {'script.stage': {...}}"""
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.stages = {}
+
+    def run(self, script, stage, fn, amount, unit):
+        """Time fn, recording its throughput as amount (bytes for MB/s, items otherwise) per second"""
+        result, seconds, peak = measure(fn, self.repeat)
+        if unit == 'MB/s':
+            throughput = amount / 1e6 / seconds if seconds else 0.0
+        else:
+            throughput = amount / seconds if seconds else 0.0
+        self.stages[f"{script}.{stage}"] = {
+            'seconds': seconds,
+            'peak_bytes': peak,
+            'throughput': throughput,
+            'unit': unit
+        }
+        return result
+
+def bench_feed(recorder, script, module, url, body, parse, summarize_name, format_section, readme):
+    """Time the stages of one of the feed scripts"""
+    text = recorder.run(script, 'fetch', lambda: feed_stream.fetch_feed(url), len(body), 'MB/s')
+    if not text:
+        raise SystemExit(f"{script}: fetching {url} failed")
+
+    summarize = getattr(module, summarize_name)
+    with patched(module, summarize_name, keep_raw):
+        raw_entries = recorder.run(script, 'parse', lambda: parse(text), len(body), 'MB/s')
+    if not raw_entries:
+        raise SystemExit(f"{script}: no entries parsed")
+
+    field = 'summary' if hasattr(raw_entries[0], 'summary') else 'description'
+    summaries = recorder.run(script, 'summarize',
+                             lambda: [summarize(getattr(entry, field), 150) for entry in raw_entries],
+                             len(raw_entries), 'entries/s')
+    entries = [type(entry).from_dict(dict(entry.to_dict(), **{field: summary}))
+               for entry, summary in zip(raw_entries, summaries)]
+
+    content = recorder.run(script, 'format', lambda: format_section(entries), len(entries), 'entries/s')
+    recorder.run(script, 'splice', lambda: readme_sections.render(readme, {module.SECTION: content}),
+                 len(readme), 'MB/s')
+
+def bench_contributions(recorder, contributions, server_url, args, readme):
+    """Time the stages of the contributions script"""
+    # Keep every body github_request decodes during the fetch, as read_body handed it over
+    decode_json = contributions.decode_json
+    bodies = {}
+
+    def keep_body(content):
+        bodies.setdefault(bytes(content), content)
+        return decode_json(content)
+
+    with patched(contributions, 'GITHUB_API_URL', server_url), patched(contributions, 'decode_json', keep_body):
+        repos = recorder.run('contributions', 'fetch',
+                             lambda: contributions.collect_repos(GITHUB_USER, index_path=''),
+                             args.repos, 'repos/s')
+    if not repos:
+        raise SystemExit("contributions: fetching repositories failed")
+
+    # The script's own decode path over what the mock server sent
+    size = sum(len(body) for body in bodies)
+    recorder.run('contributions', 'parse', lambda: [contributions.decode_json(body) for body in bodies.values()],
+                 size, 'MB/s')
+
+    content = recorder.run('contributions', 'format', lambda: contributions.format_contributions(repos),
+                           len(repos), 'repos/s')
+    recorder.run('contributions', 'splice',
+                 lambda: readme_sections.render(readme, {contributions.SECTION: content},
+                                                {contributions.SECTION: contributions.README_ANCHOR}),
+                 len(readme), 'MB/s')
+
+def run_benchmarks(args):
+    blog = load_script('update-blog-posts')
+    youtube = load_script('update-youtube-videos')
+    contributions = load_script('update-contributions')
+
+    if args.feed_format == 'atom':
+        blog_feed = synthetic_atom_feed(args.entries, args.feed_bytes)
+    else:
+        blog_feed = synthetic_rss_feed(args.entries, args.feed_bytes)
+    video_feed = synthetic_youtube_feed(args.videos, args.description_bytes)
+
+    with open(args.readme, 'r', encoding='utf-8') as f:
+        readme = f.read()
+
+    routes = [
+        (r'/blog/feed\.xml', lambda handler, match: (200, {'Content-Type': 'application/xml'}, blog_feed)),
+        (r'/feeds/videos\.xml\?playlist_id=.*', lambda handler, match: (200, {'Content-Type': 'application/atom+xml'},
+                                                                        video_feed)),
+    ] + github_api_routes(args.repos, args.events, contributions.EVENTS_PER_PAGE, GITHUB_OWNER)
+
+    recorder = StageRecorder(args.repeat)
+    with MockServer(routes, latency=args.latency, bandwidth=args.bandwidth) as server:
+        bench_feed(recorder, 'blog', blog, f"{server.url}/blog/feed.xml", blog_feed,
+                   blog.parse_rss_feed, 'extract_summary', blog.format_blog_roll, readme)
+        bench_feed(recorder, 'youtube', youtube, f"{server.url}/feeds/videos.xml?playlist_id=bench", video_feed,
+                   youtube.parse_youtube_feed, 'extract_description', youtube.format_video_list, readme)
+        bench_contributions(recorder, contributions, server.url, args, readme)
+
+    return recorder.stages
+
+def print_report(stages):
+    print(f"{'stage':<24} {'time':>10} {'throughput':>20} {'peak':>10}")
+    for name, stage in stages.items():
+        print(f"{name:<24} {stage['seconds'] * 1000:8.2f}ms "
+              f"{stage['throughput']:>12,.1f} {stage['unit']:<7} {stage['peak_bytes'] / 1024:8.0f}KB")
+
+def check_baseline(stages, baseline, tolerance, slack):
+    """Return the stages slower or hungrier than the baseline allows"""
+    regressions = []
+    for name, base in baseline.get('stages', {}).items():
+        stage = stages.get(name)
+        if stage is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+
+        time_limit = base['seconds'] * (1 + tolerance) + slack
+        if stage['seconds'] > time_limit:
+            regressions.append(f"{name}: {stage['seconds'] * 1000:.2f}ms > {time_limit * 1000:.2f}ms "
+                               f"(baseline {base['seconds'] * 1000:.2f}ms)")
+
+        memory_limit = base['peak_bytes'] * (1 + tolerance) + 64 * 1024
+        if stage['peak_bytes'] > memory_limit:
+            regressions.append(f"{name}: peak {stage['peak_bytes'] / 1024:.0f}KB > {memory_limit / 1024:.0f}KB "
+                               f"(baseline {base['peak_bytes'] / 1024:.0f}KB)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feed-format', choices=['atom', 'rss'], default='atom')
+    parser.add_argument('--feed-bytes', type=int, default=1024 * 1024, help='blog feed size in bytes')
+    parser.add_argument('--entries', type=int, default=50, help='blog feed entries')
+    parser.add_argument('--videos', type=int, default=15, help='playlist feed entries')
+    parser.add_argument('--description-bytes', type=int, default=2000, help='size of each video description')
+    parser.add_argument('--repos', type=int, default=50, help='contributed repositories')
+    parser.add_argument('--events', type=int, default=300, help='public events served for the user')
+    parser.add_argument('--latency', type=float, default=0.0, help='mock server latency in seconds')
+    parser.add_argument('--bandwidth', type=float, default=None, help='mock server bytes per second')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per stage; the best is reported')
+    parser.add_argument('--readme', default=README_PATH, help='README used for the splice stage')
+    parser.add_argument('--json', metavar='PATH', help='write the results to PATH')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write the results as a baseline')
+    parser.add_argument('--check', metavar='PATH', help='exit 1 when a stage regressed past the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown/growth (0.25 = 25%%)')
+    parser.add_argument('--slack', type=float, default=0.002, help='extra seconds allowed per stage for noise')
+    args = parser.parse_args()
+
+    stages = run_benchmarks(args)
+    print_report(stages)
+
+    config = {key: value for key, value in vars(args).items()
+              if key not in ('json', 'save_baseline', 'check', 'tolerance', 'slack', 'readme')}
+    results = {'config': config, 'stages': stages}
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {path}")
+
+    if args.check:
+        with open(args.check, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('config') != config:
+            print("Warning: baseline was recorded with different settings")
+
+        regressions = check_baseline(stages, baseline, args.tolerance, args.slack)
+        if regressions:
+            print(f"\n{len(regressions)} regressions against {args.check}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.check}")
+
+if __name__ == "__main__":
+    main()
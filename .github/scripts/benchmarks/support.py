@@ -0,0 +1,265 @@
+"""
+Shared helpers for the benchmark scripts: loading the update scripts, building
+synthetic payloads and serving them from a local mock HTTP server.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+# Keep benchmark runs independent of any persistent cache in the working tree
+os.environ.setdefault('HTTP_CACHE', '0')
+
+from script_loader import load_script  # noqa: E402
+
+def json_response(data, status=200, headers=None):
+    """Build a (status, headers, body) triple for a JSON payload"""
+    response_headers = {'Content-Type': 'application/json; charset=utf-8'}
+    response_headers.update(headers or {})
+    return status, response_headers, json.dumps(data).encode('utf-8')
+
+def _post_body(i, paragraphs):
+    paragraph = ('<p>Spec-driven development keeps the <em>intent</em> of a change next to its code, '
+                 'so reviewers &amp; agents can check the implementation against it.</p>\n')
+    return f"<h2>Section {i}</h2>\n" + paragraph * paragraphs
+
+def synthetic_atom_feed(entries=50, target_bytes=5 * 1024 * 1024):
+    """Build a full-content Atom feed of roughly target_bytes"""
+    paragraphs = max(1, target_bytes // entries // 160)
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n'
+             '<title>Synthetic Blog</title>\n']
+    for i in range(entries):
+        day = 28 - i % 28
+        parts.append(
+            f"<entry><title>Post {i}</title>"
+            f'<link href="https://blog.example.com/posts/{i}"/>'
+            f"<id>urn:post:{i}</id>"
+            f"<published>2026-{12 - i % 12:02d}-{day:02d}T10:00:00Z</published>"
+            f"<content type=\"html\"><![CDATA[{_post_body(i, paragraphs)}]]></content>"
+            "</entry>\n"
+        )
+    parts.append('</feed>\n')
+    return ''.join(parts).encode('utf-8')
+
+def synthetic_rss_feed(entries=50, target_bytes=5 * 1024 * 1024):
+    """Build a full-content RSS 2.0 feed (content:encoded) of roughly target_bytes"""
+    paragraphs = max(1, target_bytes // entries // 160)
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n'
+             '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">\n'
+             '<channel><title>Synthetic Blog</title>\n']
+    for i in range(entries):
+        day = 28 - i % 28
+        parts.append(
+            f"<item><title>Post {i}</title>"
+            f"<link>https://blog.example.com/posts/{i}</link>"
+            f"<guid>urn:post:{i}</guid>"
+            f"<pubDate>Mon, {day:02d} Sep 2026 10:00:00 +0000</pubDate>"
+            f"<description>Summary of post {i}</description>"
+            f"<content:encoded><![CDATA[{_post_body(i, paragraphs)}]]></content:encoded>"
+            "</item>\n"
+        )
+    parts.append('</channel></rss>\n')
+    return ''.join(parts).encode('utf-8')
+
+def synthetic_youtube_feed(entries=15, description_bytes=2000):
+    """Build a YouTube playlist Atom feed with media:description text"""
+    sentence = 'Walking through spec-driven development with agents, step by step. '
+    description = (sentence * (description_bytes // len(sentence) + 1))[:description_bytes]
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" '
+             'xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">\n'
+             '<title>Synthetic Playlist</title>\n']
+    for i in range(entries):
+        day = 28 - i % 28
+        parts.append(
+            f"<entry><id>yt:video:vid{i:08d}</id><yt:videoId>vid{i:08d}</yt:videoId>"
+            f"<title>Video {i}</title>"
+            f'<link rel="alternate" href="https://www.youtube.com/watch?v=vid{i:08d}"/>'
+            f"<published>2026-{12 - i % 12:02d}-{day:02d}T10:00:00+00:00</published>"
+            f"<media:group><media:title>Video {i}</media:title>"
+            f"<media:description>{description}</media:description></media:group>"
+            "</entry>\n"
+        )
+    parts.append('</feed>\n')
+    return ''.join(parts).encode('utf-8')
+
+def synthetic_repo_payload(owner, name):
+    """REST API payload for a synthetic public repository"""
+    return {
+        'name': name,
+        'full_name': f"{owner}/{name}",
+        'description': f"Synthetic repository {name} used to exercise the contributions pipeline",
+        'html_url': f"https://github.com/{owner}/{name}",
+        'stargazers_count': sum(map(ord, name)) * 37 % 5000,
+        'forks_count': 3,
+        'language': 'Python',
+        'fork': False,
+        'private': False
+    }
+
+def github_api_routes(repos=50, events=300, per_page=100, owner='bench-org'):
+    """Mock routes for the events, commit search, repository and GraphQL star lookup endpoints
+
+    The user's public events are PushEvents spread over `repos` repositories,
+    paginated with Link headers the way the real API does it.
+    """
+    def events_page(handler, match):
+        base, page, size = match.group(1), int(match.group(2)), int(match.group(3))
+        last_page = max(1, (events + size - 1) // size)
+        start = (page - 1) * size
+        page_events = [{
+            'id': str(10 ** 9 - i),
+            'type': 'PushEvent',
+            'repo': {'name': f"{owner}/repo-{i % repos}"}
+        } for i in range(start, min(start + size, events))]
+
+        links = [f'<http://mock{base}?page={last_page}&per_page={size}>; rel="last"']
+        if page < last_page:
+            links.insert(0, f'<http://mock{base}?page={page + 1}&per_page={size}>; rel="next"')
+        return json_response(page_events, headers={'Link': ', '.join(links)})
+
+    def search(handler, match):
+        return json_response({'items': [
+            {'repository': {'full_name': f"{owner}/repo-{i}"}} for i in range(min(repos, 30))
+        ]})
+
+    def repo(handler, match):
+        return json_response(synthetic_repo_payload(match.group(1), match.group(2)))
+
+    def graphql(handler, match):
+        # Aliased repository lookups (r0, r1, ...) answered with the REST payload's star count
+        variables = json.loads(handler.request_body).get('variables') or {}
+        data = {}
+        for key, name in variables.items():
+            if key.startswith('n'):
+                payload = synthetic_repo_payload(variables[f"o{key[1:]}"], name)
+                data[f"r{key[1:]}"] = {'stargazerCount': payload['stargazers_count'], 'isPrivate': False}
+        return json_response({'data': data})
+
+    return [
+        (r'(/users/[^/]+/events/public)\?page=(\d+)&per_page=(\d+)', events_page),
+        (r'/search/commits\?.*', search),
+        (r'/repos/([^/]+)/([^/?]+)', repo),
+        (r'/graphql', graphql),
+    ]
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections once many workers connect at once
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Clients closing a connection early (e.g. a streaming parser) are expected
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+class MockServer:
+    """Local HTTP server answering requests from a list of (regex, handler) routes
+
+    Each handler receives the request handler and the regex match and returns a
+    (status, headers, body) triple. Every response is delayed by `latency`
+    seconds to stand in for a real network round trip, and bodies are sent at
+    no more than `bandwidth` bytes per second when it is set. Every new
+    connection additionally costs `connect_latency` seconds (standing in for
+    TCP/TLS handshake round trips), and passing an `ssl_context` serves HTTPS.
+    """
+
+    def __init__(self, routes, latency=0.0, bandwidth=None, connect_latency=0.0, ssl_context=None):
+        self.routes = [(re.compile(pattern), handler) for pattern, handler in routes]
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.connect_latency = connect_latency
+        self.request_count = 0
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), self._handler_class())
+        self.scheme = 'http'
+        if ssl_context is not None:
+            self._server.socket = ssl_context.wrap_socket(self._server.socket, server_side=True)
+            self.scheme = 'https'
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"{self.scheme}://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls on keep-alive
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                with server._lock:
+                    server.connection_count += 1
+                if server.connect_latency:
+                    time.sleep(server.connect_latency)
+                super().setup()
+
+            def _dispatch(self):
+                with server._lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                for pattern, handler in server.routes:
+                    match = pattern.fullmatch(self.path)
+                    if match:
+                        status, headers, body = handler(self, match)
+                        break
+                else:
+                    status, headers, body = json_response({'message': 'Not Found'}, 404)
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self._write_body(body)
+
+            def _write_body(self, body):
+                chunk_size = 64 * 1024
+                try:
+                    for start in range(0, len(body), chunk_size):
+                        self.wfile.write(body[start:start + chunk_size])
+                        if server.bandwidth:
+                            time.sleep(chunk_size / server.bandwidth)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading early, e.g. a streaming parser
+                    self.close_connection = True
+
+            def do_GET(self):
+                self._dispatch()
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.request_body = self.rfile.read(length)
+                self._dispatch()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
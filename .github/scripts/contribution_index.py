@@ -0,0 +1,107 @@
+"""
+Persistent index of contributed repositories for update-contributions.py.
+
+The events API only exposes roughly the last 90 days / 300 events, so each
+run merges what it discovers into this index instead of starting over. The
+index keeps the newest event ID seen (the cursor for the next run's early
+stop), the last event seen per repository and each repository's cached
+details with the time they were fetched.
+"""
+
+import json
+import os
+import time
+
+import records
+
+class ContributionIndex:
+    """JSON-backed index of discovered repositories and their cached details"""
+
+    def __init__(self, path):
+        self.path = path
+        self.cursor = None
+        self.repos = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.cursor = data.get('cursor')
+        self.repos = data.get('repos', {})
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'cursor': self.cursor, 'repos': self.repos}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def merge(self, discovered, cursor=None, now=None):
+        """Merge {repo_name: last_event_id or None} and advance the cursor"""
+        now = now or time.time()
+        for repo_name, event_id in discovered.items():
+            entry = self.repos.setdefault(repo_name, {
+                'last_seen_event_id': None,
+                'details': None,
+                'details_fetched_at': None
+            })
+            entry['last_seen_at'] = now
+            if event_id is not None:
+                entry['last_seen_event_id'] = event_id
+
+        if cursor is not None and (self.cursor is None or int(cursor) > int(self.cursor)):
+            self.cursor = cursor
+
+    def stale(self, max_age, now=None):
+        """Return repositories whose details are missing or older than max_age seconds"""
+        now = now or time.time()
+        return [
+            repo_name for repo_name, entry in self.repos.items()
+            if entry.get('details_fetched_at') is None or now - entry['details_fetched_at'] > max_age
+        ]
+
+    def update_details(self, repos, now=None):
+        """Store freshly fetched RepoInfo records, matched by full name"""
+        now = now or time.time()
+        by_name = {repo_name.lower(): repo_name for repo_name in self.repos}
+
+        for repo in repos:
+            repo_name = by_name.get(repo.full_name.lower(), repo.full_name)
+            entry = self.repos.setdefault(repo_name, {'last_seen_event_id': None, 'last_seen_at': now})
+            entry['details'] = repo.to_dict()
+            entry['details_fetched_at'] = now
+
+    def clear_details(self, repo_names, now=None):
+        """Forget the details of repositories that are deleted or private
+
+        They count as fetched now, so they are looked up again only once
+        their details would have gone stale.
+        """
+        now = now or time.time()
+        for repo_name in repo_names:
+            entry = self.repos.get(repo_name)
+            if entry is not None:
+                entry['details'] = None
+                entry['details_fetched_at'] = now
+
+    def details(self, repo_names=None):
+        """Return the cached details of repo_names (default: all) as RepoInfo records"""
+        if repo_names is None:
+            repo_names = self.repos
+        return [
+            records.RepoInfo.from_dict(self.repos[repo_name]['details'])
+            for repo_name in repo_names if self.repos.get(repo_name, {}).get('details')
+        ]
+
+    def cached_stars(self):
+        """Return {repo_name: star count} as of each repository's last detail fetch"""
+        return {
+            repo_name: entry['details'].get('stars') or 0
+            for repo_name, entry in self.repos.items() if entry.get('details')
+        }
@@ -0,0 +1,82 @@
+"""
+Per-run deadline shared by every request a run makes.
+
+The run gets RUN_DEADLINE seconds, counted from the first request. Every
+request's socket timeout is its usual timeout cut to what is left, a body
+still downloading when time is up is abandoned, and retry and rate-limit
+waits only happen when they fit in the waiting request's share of the time
+left: the remaining budget divided among it and the requests in flight. A
+source that runs out of time fails like any other failed fetch, and the
+scripts then fall back to the last good section they rendered.
+"""
+
+import contextlib
+import os
+import threading
+import time
+
+# Seconds a whole run may spend on network requests (0 = no deadline)
+RUN_DEADLINE = float(os.environ.get('RUN_DEADLINE', '240'))
+
+_lock = threading.Lock()
+_expires_at = None
+_in_flight = 0
+
+class DeadlineExceeded(TimeoutError):
+    """The run's deadline passed before a request could finish"""
+
+def start(budget=None):
+    """Start the run's clock (again) with budget seconds (default RUN_DEADLINE)"""
+    global _expires_at
+    budget = RUN_DEADLINE if budget is None else budget
+    with _lock:
+        _expires_at = time.monotonic() + budget if budget > 0 else None
+
+def _expiry():
+    global _expires_at
+    with _lock:
+        if _expires_at is None and RUN_DEADLINE > 0:
+            _expires_at = time.monotonic() + RUN_DEADLINE
+        return _expires_at
+
+def remaining():
+    """Seconds left in the run, or None when there is no deadline"""
+    expires_at = _expiry()
+    if expires_at is None:
+        return None
+    return max(0.0, expires_at - time.monotonic())
+
+def check():
+    """Raise DeadlineExceeded once the run is out of time"""
+    if remaining() == 0.0:
+        raise DeadlineExceeded(f"run deadline of {RUN_DEADLINE:g}s exceeded")
+
+def timeout(default):
+    """A request's timeout: default, cut to what is left of the run"""
+    check()
+    left = remaining()
+    return default if left is None else min(default, left)
+
+@contextlib.contextmanager
+def request():
+    """Count a request as in flight while the block runs (http_client does this)"""
+    global _in_flight
+    with _lock:
+        _in_flight += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _in_flight -= 1
+
+def share():
+    """The time a waiting request may use: what is left, divided among it and the requests in flight"""
+    left = remaining()
+    if left is None:
+        return float('inf')
+    with _lock:
+        return left / (_in_flight + 1)
+
+def allows(seconds):
+    """Whether waiting seconds before a retry fits in the waiting request's share"""
+    return seconds <= share()
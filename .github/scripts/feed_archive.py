@@ -0,0 +1,199 @@
+"""
+Local archive of every feed entry seen across runs, in SQLite.
+
+The feeds only carry their most recent entries, so older posts and videos
+disappear upstream. Each run adds the entries it parsed to the archive,
+keyed by feed URL and GUID (or link when an entry has none), so an entry
+seen again is updated in place instead of duplicated. Entries are indexed by
+publish date and link: the latest N, one year's entries and a page of the
+full history are index range scans, and titles can be searched, all without
+fetching the feed. The scripts render from the archive when the feed cannot
+be fetched, and can write the whole history as paged markdown files.
+"""
+
+import os
+import time
+
+ARCHIVE_PATH = os.environ.get('FEED_ARCHIVE', os.path.join('.cache', 'feed-archive.sqlite3'))
+# Directory the paged archive markdown is written to (empty = no pages)
+PAGES_DIR = os.environ.get('FEED_ARCHIVE_PAGES', '')
+PAGE_SIZE = int(os.environ.get('FEED_ARCHIVE_PAGE_SIZE', '20'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    feed TEXT NOT NULL,
+    key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    date TEXT NOT NULL,
+    text TEXT NOT NULL,
+    published TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (feed, key)
+);
+CREATE INDEX IF NOT EXISTS entries_published ON entries (feed, published, key);
+CREATE INDEX IF NOT EXISTS entries_link ON entries (link);
+"""
+
+UPSERT = """
+INSERT INTO entries (feed, key, title, link, date, text, published, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (feed, key) DO UPDATE SET
+    title = excluded.title, link = excluded.link, date = excluded.date, text = excluded.text,
+    published = COALESCE(excluded.published, published), last_seen = excluded.last_seen
+"""
+
+COLUMNS = "key, title, link, date, text, published"
+
+def _utc_text(published):
+    """Store datetimes as UTC ISO strings, which sort in time order"""
+    if published is None:
+        return None
+    from datetime import timezone
+
+    return published.astimezone(timezone.utc).isoformat()
+
+class FeedArchive:
+    """Entries of any number of feeds, stored as Post or Video records
+
+    record_type's TEXT_FIELD names the field stored in the text column
+    (a post's summary, a video's description).
+    """
+
+    def __init__(self, path=None):
+        import sqlite3
+
+        self.path = path or ARCHIVE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, feed, entries):
+        """Insert or refresh entries of feed; return the number that were new"""
+        now = time.time()
+        rows = {}
+        for entry in entries:
+            key = entry.guid or entry.link
+            if key:
+                rows[key] = (feed, key, entry.title, entry.link, entry.date,
+                             getattr(entry, type(entry).TEXT_FIELD), _utc_text(entry.published), now, now)
+
+        with self._db:
+            # Primary key lookups, so the cost does not grow with the archive
+            known = sum(self._db.execute("SELECT COUNT(*) FROM entries WHERE feed = ? AND key = ?",
+                                         (feed, key)).fetchone()[0] for key in rows)
+            self._db.executemany(UPSERT, rows.values())
+        return len(rows) - known
+
+    def count(self, feed):
+        return self._db.execute("SELECT COUNT(*) FROM entries WHERE feed = ?", (feed,)).fetchone()[0]
+
+    def contains(self, feed, entry):
+        """Whether entry (a Post or Video) is already archived for feed"""
+        key = entry.guid or entry.link
+        return self._db.execute("SELECT 1 FROM entries WHERE feed = ? AND key = ?", (feed, key)).fetchone() is not None
+
+    def _records(self, record_type, query, params):
+        from datetime import datetime
+
+        entries = []
+        for key, title, link, date, text, published in self._db.execute(query, params):
+            entries.append(record_type(**{
+                'title': title,
+                'link': link,
+                'date': date,
+                record_type.TEXT_FIELD: text,
+                'published': datetime.fromisoformat(published) if published else None,
+                'guid': key
+            }))
+        return entries
+
+    def latest(self, feed, record_type, limit, offset=0):
+        """The newest entries, newest first; entries without a date come last"""
+        # NULLs sort lowest, and (feed, published, key) is exactly the index order
+        return self._records(record_type,
+                             f"SELECT {COLUMNS} FROM entries WHERE feed = ? "
+                             "ORDER BY published DESC, key DESC LIMIT ? OFFSET ?",
+                             (feed, limit, offset))
+
+    def by_year(self, feed, record_type, year):
+        """Entries published in year, newest first"""
+        return self._records(record_type,
+                             f"SELECT {COLUMNS} FROM entries WHERE feed = ? AND published >= ? AND published < ? "
+                             "ORDER BY published DESC, key DESC",
+                             (feed, f"{year:04d}", f"{year + 1:04d}"))
+
+    def search(self, feed, record_type, text, limit=20):
+        """Entries whose title contains text (case-insensitive), newest first"""
+        pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return self._records(record_type,
+                             f"SELECT {COLUMNS} FROM entries WHERE feed = ? AND title LIKE ? ESCAPE '\\' "
+                             "ORDER BY published DESC, key DESC LIMIT ?",
+                             (feed, pattern, limit))
+
+    def years(self, feed):
+        """Return [(year, number of entries)], newest year first"""
+        return self._db.execute(
+            "SELECT CAST(substr(published, 1, 4) AS INTEGER), COUNT(*) FROM entries "
+            "WHERE feed = ? AND published IS NOT NULL GROUP BY 1 ORDER BY 1 DESC", (feed,)).fetchall()
+
+def open_archive():
+    """Return the archive configured from the environment, or None if disabled"""
+    if not ARCHIVE_PATH:
+        return None
+    return FeedArchive(ARCHIVE_PATH)
+
+def page_name(name, page):
+    return f"{name}-{page}.md"
+
+def write_pages(archive, feed, record_type, name, title, format_entry, directory=None, per_page=None):
+    """Write the whole history of feed as markdown pages name-1.md, name-2.md, ...
+
+    Pages go to directory (default PAGES_DIR) with per_page entries each
+    (default PAGE_SIZE), newest first, linked to their neighbours. Pages left
+    over from a longer history are removed. Returns the number of pages.
+    """
+    import readme_sections
+
+    directory = directory or PAGES_DIR
+    per_page = max(1, per_page or PAGE_SIZE)
+    total = max(1, -(-archive.count(feed) // per_page))
+    os.makedirs(directory, exist_ok=True)
+
+    for page in range(1, total + 1):
+        entries = archive.latest(feed, record_type, per_page, (page - 1) * per_page)
+        links = []
+        if page > 1:
+            links.append(f"[← Newer]({page_name(name, page - 1)})")
+        links.append(f"Page {page} of {total}")
+        if page < total:
+            links.append(f"[Older →]({page_name(name, page + 1)})")
+
+        content = f"# {title}\n\n" + ''.join(format_entry(entry) for entry in entries)
+        content += ' · '.join(links) + "\n"
+        path = os.path.join(directory, page_name(name, page))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    continue
+        except FileNotFoundError:
+            pass
+        readme_sections.write_atomic(path, content)
+
+    page = total + 1
+    while os.path.exists(os.path.join(directory, page_name(name, page))):
+        os.remove(os.path.join(directory, page_name(name, page)))
+        page += 1
+    return total
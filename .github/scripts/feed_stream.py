@@ -0,0 +1,196 @@
+"""
+Incremental feed parsing on top of ElementTree's XMLPullParser.
+
+Raw bytes are fed to the parser in chunks straight from the HTTP response and
+each entry element is handed out as soon as its end tag has been parsed, then
+cleared. Callers stop iterating once they have the entries they need, so the
+rest of a large full-content feed is never downloaded or built into a DOM.
+A feed body larger than MAX_FEED_BYTES is refused instead of being parsed
+truncated.
+"""
+
+CHUNK_SIZE = 16 * 1024
+MAX_FEED_BYTES = 5 * 1024 * 1024
+
+class FeedTooLarge(ValueError):
+    """A feed body is larger than the reader's limit"""
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE, limit=MAX_FEED_BYTES):
+    """Yield chunks of source: a str/bytes document, a readable response or an iterable
+
+    Raises FeedTooLarge (a ValueError) once more than limit bytes are read
+    from a response; documents are cut at limit as before.
+    """
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        view = memoryview(source) if not isinstance(source, str) else source
+        for start in range(0, min(len(source), limit), chunk_size):
+            yield view[start:min(start + chunk_size, limit)]
+    elif hasattr(source, 'read'):
+        remaining = limit
+        while True:
+            # Once the limit is reached, one more byte tells a complete body from an oversize one
+            chunk = source.read(min(chunk_size, remaining) if remaining > 0 else 1)
+            if not chunk:
+                break
+            if remaining <= 0:
+                raise FeedTooLarge(f"Feed is larger than {limit:,} bytes")
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        yield from source
+
+def iter_entries(chunks, entry_tags):
+    """Yield every element whose tag is in entry_tags as soon as it is complete
+
+    Yielded elements are cleared and detached from their parent once the
+    caller resumes iteration, so memory stays bounded by a single entry.
+    """
+    # Deferred so runs that never parse a feed skip loading the XML stack
+    import xml.etree.ElementTree as ET
+
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    open_elements = []
+
+    def completed_entries():
+        for event, element in parser.read_events():
+            if event == 'start':
+                open_elements.append(element)
+                continue
+
+            open_elements.pop()
+            if element.tag in entry_tags:
+                yield element
+                element.clear()
+                if open_elements:
+                    open_elements[-1].remove(element)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from completed_entries()
+
+    parser.close()
+    yield from completed_entries()
+
+class FeedReader:
+    """Iterate over the chunks of a feed body while keeping the bytes that were read
+
+    Chunks read from a response are appended to a single bytearray, so the
+    body is held once rather than as a list of chunks plus their join.
+    """
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE, limit=MAX_FEED_BYTES):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.limit = limit
+        self._body = bytearray()
+        self._iterator = iter_chunks(source, chunk_size, limit)
+
+    def __iter__(self):
+        for chunk in self._iterator:
+            if not isinstance(self.source, (str, bytes, bytearray)):
+                self._body += chunk
+            yield chunk
+
+    def drain(self):
+        """Read whatever is left of the body"""
+        for _ in self:
+            pass
+
+    @property
+    def content(self):
+        """The bytes read so far (the whole source when it is a document)"""
+        if isinstance(self.source, (str, bytes, bytearray)):
+            return self.source
+        return self._body
+
+def read_feed(source, parse, url=None, cache=None):
+    """Run parse over the chunks of source and return (result, bytes read)
+
+    source is either a complete body (e.g. from the HTTP cache) or an open
+    response, which is closed as soon as parse returns. When the response
+    carries cache validators the remainder is drained first so the full body
+    can be stored in cache. When draining fails (the body is too large, the
+    deadline passed, the connection dropped) nothing is stored, and the
+    parsed result is returned with the bytes read so far.
+    """
+    reader = FeedReader(source)
+    if not hasattr(source, 'read'):
+        return parse(reader), reader.content
+
+    with source:
+        result = parse(reader)
+        if cache and cache.accepts(source.headers):
+            try:
+                reader.drain()
+            except Exception as e:
+                print(f"Warning: not caching {url}, reading the rest of the feed failed: {e}")
+            else:
+                cache.store(url, reader.content, source.headers)
+
+    return result, reader.content
+
+def open_feed(url):
+    """Open the feed at url, revalidating against the HTTP cache
+
+    Returns the cached body as bytes when it can be reused, otherwise the open
+    response so the body can be streamed into the parser. None on failure.
+    """
+    if not url.startswith(('http://', 'https://')):
+        print(f"Invalid URL scheme: {url}")
+        return None
+
+    import http_cache
+
+    cache = http_cache.get_cache()
+    if cache:
+        cached = cache.get(url)
+        if cached is not None:
+            print("Using cached feed")
+            return cached
+
+    # Only a network fetch needs the HTTP and TLS stack
+    import urllib.error
+    import urllib.request
+    import http_client
+
+    try:
+        req = urllib.request.Request(url)
+        req.add_header('User-Agent', 'Mozilla/5.0 (GitHub-Profile-Updater)')
+        if cache:
+            for key, value in cache.conditional_headers(url).items():
+                req.add_header(key, value)
+
+        response = http_client.urlopen(req, timeout=10, limit=MAX_FEED_BYTES)
+        content_type = response.headers.get('Content-Type', '')
+        if not any(ct in content_type.lower() for ct in ['xml', 'rss', 'atom', 'application/xml', 'text/xml']):
+            print(f"Warning: Unexpected content type: {content_type}")
+        return response
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cache:
+            cached = cache.revalidated(url)
+            if cached is not None:
+                print("Feed not modified, using cached copy")
+                return cached
+        print(f"HTTP Error fetching RSS feed: {e.code} {e.reason}")
+        return None
+    except urllib.error.URLError as e:
+        print(f"URL Error fetching RSS feed: {e.reason}")
+        return None
+    except Exception as e:
+        print(f"Error fetching RSS feed: {e}")
+        return None
+
+def fetch_feed(url):
+    """Fetch the whole feed from url and return its raw bytes, or None on failure"""
+    feed = open_feed(url)
+    if feed is None:
+        return None
+
+    import http_cache
+
+    try:
+        _, content = read_feed(feed, FeedReader.drain, url, http_cache.get_cache())
+        return content
+    except Exception as e:
+        print(f"Error fetching RSS feed: {e}")
+        return None
@@ -0,0 +1,86 @@
+"""
+Content fingerprints used to skip README updates when upstream data is unchanged.
+
+Each script hashes what it fetched (together with its own source and the
+helper modules it parses and formats with, so a change to the rendering code
+still forces a rewrite) and compares the digest with the
+one stored by the last successful run. On a match the script exits early with
+EXIT_UNCHANGED, which lets the workflow skip its commit step.
+"""
+
+import hashlib
+import json
+import os
+
+FINGERPRINT_ENABLED = os.environ.get('SKIP_UNCHANGED', '1') != '0'
+STATE_PATH = os.environ.get('FINGERPRINT_STATE', os.path.join('.cache', 'fingerprints.json'))
+
+# Exit status of a run that found nothing new upstream
+EXIT_UNCHANGED = 3
+
+class _Unchanged:
+    def __repr__(self):
+        return 'UNCHANGED'
+
+# Returned by main() when the fingerprint matched and the README was left alone
+UNCHANGED = _Unchanged()
+
+def compute(data, *source_files):
+    """Return a hex digest of data (bytes, str or JSON-serializable) and source_files"""
+    digest = hashlib.sha256()
+
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    elif not isinstance(data, (bytes, bytearray, memoryview)):
+        data = json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    digest.update(data)
+
+    for path in source_files:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+def sources(script_path, *modules):
+    """Paths of a script and of the named helper modules next to it
+
+    Each script keeps its own as RENDER_SOURCES: the helper modules its
+    section is parsed and formatted with, hashed together with the fetched
+    data. Modules are given by name so that they are hashed without being
+    imported.
+    """
+    directory = os.path.dirname(os.path.abspath(script_path))
+    return (script_path,) + tuple(os.path.join(directory, f"{module}.py") for module in modules)
+
+def _load_state():
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def is_unchanged(source, digest):
+    """Return True if digest matches the fingerprint recorded for source"""
+    if not FINGERPRINT_ENABLED:
+        return False
+    return _load_state().get(source) == digest
+
+def record(source, digest):
+    """Remember digest as the fingerprint of the last successful run for source"""
+    if not FINGERPRINT_ENABLED:
+        return
+
+    state = _load_state()
+    state[source] = digest
+
+    directory = os.path.dirname(STATE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{STATE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+def exit_code(result):
+    """Map the return value of a script's main() to its process exit status"""
+    return EXIT_UNCHANGED if result is UNCHANGED else 0
@@ -0,0 +1,202 @@
+"""
+Persistent on-disk HTTP cache shared by the update scripts.
+
+Response bodies are stored on disk keyed by URL together with their ETag and
+Last-Modified validators, so the next run can send a conditional request and
+reuse the stored body when the server answers 304 Not Modified. The cache is
+bounded in size (least recently used entries are evicted first) and entries
+younger than the TTL are served without touching the network at all.
+
+The index of entries is kept in memory and written back once, by flush(),
+which the shared cache runs when the process exits, instead of on every
+hit, revalidation and store.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import metrics
+
+CACHE_ENABLED = os.environ.get('HTTP_CACHE', '1') != '0'
+CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', os.path.join('.cache', 'http'))
+CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+# Seconds a stored response is served without revalidation (0 = always revalidate)
+CACHE_TTL = int(os.environ.get('HTTP_CACHE_TTL', '0'))
+
+INDEX_FILE = 'index.json'
+# Response headers kept alongside the body, e.g. for pagination of cached pages
+KEPT_HEADERS = ('Link',)
+
+class HTTPCache:
+    """Size-bounded LRU cache of response bodies and validators, keyed by URL"""
+
+    def __init__(self, directory, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index = None
+        self._dirty = False
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, f"{key}.body")
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def flush(self):
+        """Write the index back to disk if it changed since it was loaded or last flushed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self._save_index()
+                self._dirty = False
+            except OSError as e:
+                print(f"Warning: could not save the HTTP cache index: {e}")
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, path)
+
+    def _read_body(self, key):
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _remove(self, key):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = sum(entry['size'] for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= entry['size']
+            self._remove(key)
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, url, ttl=None):
+        """Return the stored body for url if it exists and is younger than ttl"""
+        ttl = self.ttl if ttl is None else ttl
+        key = self.key(url)
+        with self._lock:
+            entry = self._load_index().get(key)
+            if entry is None or ttl <= 0 or time.time() - entry['stored_at'] > ttl:
+                metrics.increment('cache.misses')
+                return None
+            metrics.increment('cache.hits')
+            return self._touch(key)
+
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for a cached url"""
+        with self._lock:
+            entry = self._load_index().get(self.key(url))
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def headers(self, url):
+        """Return the response headers kept for a cached url"""
+        with self._lock:
+            entry = self._load_index().get(self.key(url))
+        return dict(entry.get('headers') or {}) if entry else {}
+
+    def revalidated(self, url):
+        """Return the stored body after a 304 response and restart its TTL"""
+        key = self.key(url)
+        with self._lock:
+            entry = self._load_index().get(key)
+            if entry is None:
+                return None
+            entry['stored_at'] = time.time()
+            metrics.increment('cache.revalidated')
+            return self._touch(key)
+
+    def _touch(self, key):
+        body = self._read_body(key)
+        if body is None:
+            self._remove(key)
+        else:
+            self._index[key]['last_access'] = time.time()
+        self._dirty = True
+        return body
+
+    def accepts(self, headers):
+        """Return True if a response with these headers would be stored"""
+        return bool(headers.get('ETag') or headers.get('Last-Modified') or self.ttl > 0)
+
+    def store(self, url, body, headers):
+        """Store a 200 response body with its validators"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not self.accepts(headers) or len(body) > self.max_bytes:
+            return
+
+        key = self.key(url)
+        now = time.time()
+        with self._lock:
+            index = self._load_index()
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._body_path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, self._body_path(key))
+
+            index[key] = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'headers': {name: headers.get(name) for name in KEPT_HEADERS if headers.get(name)},
+                'size': len(body),
+                'stored_at': now,
+                'last_access': now
+            }
+            self._evict()
+            self._dirty = True
+        metrics.increment('cache.stores')
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the shared cache configured from the environment, or None if disabled"""
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            import atexit
+
+            _default_cache = HTTPCache(CACHE_DIR)
+            atexit.register(_default_cache.flush)
+    return _default_cache
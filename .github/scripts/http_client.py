@@ -0,0 +1,360 @@
+"""
+Shared HTTP client with per-host keep-alive connection pools.
+
+urllib.request opens a new TCP (and TLS) connection for every request. This
+module keeps idle http.client connections per (scheme, host, port) and reuses
+them, asks for gzip/deflate bodies and decompresses them as they are read, and
+transparently reconnects when a pooled socket turns out to be stale.
+
+urlopen() mirrors urllib.request.urlopen closely enough to be a drop-in: it
+takes a urllib.request.Request, follows redirects, and raises
+urllib.error.HTTPError / URLError in the same situations. Timeouts are cut
+to what is left of the run's deadline, and a body still being read when the
+deadline passes raises deadline.DeadlineExceeded. Passing a limit
+caps the decoded body size: a larger Content-Length is refused before
+anything is read, and reading past the limit raises ResponseTooLarge.
+With HTTP_REPLAY set, requests go through the http_replay transport, which
+records responses to or replays them from a cassette.
+"""
+
+import http.client
+import io
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import zlib
+
+import deadline
+import http_replay
+import metrics
+
+MAX_IDLE_PER_HOST = 8
+MAX_REDIRECTS = 5
+READ_CHUNK_SIZE = 16 * 1024
+ERROR_BODY_LIMIT = 64 * 1024
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Errors that mean a reused keep-alive socket was closed by the server
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+# SSL context used for https connections; created on first use
+ssl_context = None
+
+class ResponseTooLarge(ValueError):
+    """A response body is larger than the limit the caller allows"""
+
+    def __init__(self, url, size, limit):
+        super().__init__(f"{url}: response of {size:,} bytes exceeds the {limit:,} byte limit")
+        self.url = url
+        self.size = size
+        self.limit = limit
+
+def _get_ssl_context():
+    global ssl_context
+    if ssl_context is None:
+        import ssl
+        ssl_context = ssl.create_default_context()
+    return ssl_context
+
+class ConnectionPool:
+    """Idle keep-alive connections to one scheme/host/port"""
+
+    def __init__(self, scheme, host, port, max_idle=MAX_IDLE_PER_HOST):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def new_connection(self, timeout):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout,
+                                               context=_get_ssl_context())
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def get(self, timeout):
+        """Return (connection, reused) with the socket timeout set"""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+
+        if conn is None:
+            return self.new_connection(timeout), False
+
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def put(self, conn):
+        """Hand a connection whose response was fully read back to the pool"""
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(scheme, host, port):
+    """Return the shared pool for a scheme/host/port"""
+    key = (scheme, host, port)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(scheme, host, port)
+        return _pools[key]
+
+def close_all():
+    """Close every pooled connection"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+class Response:
+    """A response whose body is decompressed as it is read
+
+    Closing the response returns its connection to the pool when the body was
+    read to the end, and closes the socket otherwise. When limit is set,
+    reading more than limit decoded bytes raises ResponseTooLarge.
+    """
+
+    def __init__(self, url, raw, conn, pool, limit=None):
+        self.url = url
+        self.status = raw.status
+        self.reason = raw.reason
+        self.headers = raw.headers
+        self._raw = raw
+        self._conn = conn
+        self._pool = pool
+        self._buffer = bytearray()
+        self._eof = False
+        self._received = 0
+        self._decoded = 0
+        self._download_seconds = 0.0
+        self.limit = limit
+
+        encoding = (raw.headers.get('Content-Encoding') or '').strip().lower()
+        if encoding in ('gzip', 'x-gzip'):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            # zlib-wrapped or gzip; raw deflate streams are handled in _fill
+            self._decoder = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        else:
+            self._decoder = None
+        self._raw_deflate = encoding == 'deflate'
+
+    def getcode(self):
+        return self.status
+
+    def _decode(self, chunk):
+        if self._decoder is None:
+            return chunk
+        try:
+            return self._decoder.decompress(chunk)
+        except zlib.error:
+            if not self._raw_deflate:
+                raise
+            # Some servers send raw deflate data without the zlib header
+            self._raw_deflate = False
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decoder.decompress(chunk)
+
+    def _fill(self, size):
+        """Read from the socket until size decoded bytes are buffered or the body ends"""
+        while not self._eof and (size is None or len(self._buffer) < size):
+            deadline.check()
+            start = time.monotonic()
+            chunk = self._raw.read(READ_CHUNK_SIZE)
+            self._download_seconds += time.monotonic() - start
+            self._received += len(chunk)
+            if not chunk:
+                decoded = self._decoder.flush() if self._decoder is not None else b''
+                self._eof = True
+            else:
+                decoded = self._decode(chunk)
+
+            self._decoded += len(decoded)
+            if self.limit is not None and self._decoded > self.limit:
+                raise ResponseTooLarge(self.url, self._decoded, self.limit)
+            self._buffer += decoded
+
+    def read(self, amt=None):
+        """Read up to amt decoded bytes (everything when amt is None)"""
+        if amt is not None and amt < 0:
+            amt = None
+        self._fill(amt)
+        if amt is None or amt >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            # One copy out of the buffer; deleting from its front does not move the rest
+            with memoryview(self._buffer) as view:
+                data = bytes(view[:amt])
+            del self._buffer[:amt]
+        return data
+
+    def read_body(self):
+        """Read the rest of the body and return it as one bytearray
+
+        The read buffer itself is handed over instead of being copied into a
+        bytes object; json.loads and the XML parsers accept it as is.
+        """
+        self._fill(None)
+        body, self._buffer = self._buffer, bytearray()
+        return body
+
+    def read_raw(self, limit=None):
+        """Read the rest of the body as sent, without decompressing it (for recording)
+
+        Raises ResponseTooLarge when the body is longer than limit bytes.
+        """
+        data = self._raw.read() if limit is None else self._raw.read(limit + 1)
+        self._received += len(data)
+        if limit is not None and len(data) > limit:
+            raise ResponseTooLarge(self.url, len(data), limit)
+        self._eof = True
+        return data
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        metrics.add_time('http.download', self._download_seconds)
+        metrics.increment('http.bytes_received', self._received)
+        if self._raw.isclosed() and not self._raw.will_close:
+            self._pool.put(conn)
+        else:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _exchange(conn, reused, method, target, body, headers):
+    """Connect if needed, send the request and wait for the response headers"""
+    if not reused:
+        # DNS lookup, TCP connect and TLS handshake
+        with metrics.timer('http.connect'):
+            conn.connect()
+    with metrics.timer('http.ttfb'):
+        conn.request(method, target, body=body, headers=headers)
+        return conn.getresponse()
+
+def _check_length(response, limit):
+    """Refuse a response whose declared length is already over limit"""
+    declared = (response.headers.get('Content-Length') or '').strip()
+    if declared.isdigit() and int(declared) > limit:
+        raise ResponseTooLarge(response.url, int(declared), limit)
+
+def send_live(method, url, headers, body, timeout):
+    """Send one request over a pooled connection and return the Response"""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        raise urllib.error.URLError(f"unknown url type: {parts.scheme}")
+
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    pool = get_pool(parts.scheme, parts.hostname, port)
+    target = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+
+    headers = dict(headers or {})
+    if not any(key.lower() == 'accept-encoding' for key in headers):
+        headers['Accept-Encoding'] = 'gzip, deflate'
+
+    metrics.increment('http.requests')
+    conn, reused = pool.get(timeout)
+    metrics.increment('http.connections_reused' if reused else 'http.connections_opened')
+    try:
+        raw = _exchange(conn, reused, method, target, body, headers)
+    except STALE_CONNECTION_ERRORS:
+        conn.close()
+        if not reused:
+            raise
+        # The pooled socket was closed by the server; retry once on a fresh one
+        metrics.increment('http.stale_reconnects')
+        conn = pool.new_connection(timeout)
+        try:
+            raw = _exchange(conn, False, method, target, body, headers)
+        except BaseException:
+            conn.close()
+            raise
+    except BaseException:
+        conn.close()
+        raise
+
+    return Response(url, raw, conn, pool)
+
+def _send(method, url, headers, body, timeout):
+    """Send one request over the network, or through the record/replay transport when one is set"""
+    transport = http_replay.get_transport()
+    if transport is not None:
+        return transport.send(method, url, headers, body, timeout)
+    return send_live(method, url, headers, body, timeout)
+
+def request(method, url, headers=None, body=None, timeout=10, limit=None):
+    """Perform a request, following redirects
+
+    Returns a Response for 2xx statuses and raises urllib.error.HTTPError for
+    anything else (including 304), or urllib.error.URLError when the server
+    cannot be reached. With a limit, a 2xx response whose Content-Length is
+    larger is closed and ResponseTooLarge raised before its body is read.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        try:
+            with deadline.request():
+                response = _send(method, url, headers, body, deadline.timeout(timeout))
+        except (OSError, http.client.HTTPException) as e:
+            if isinstance(e, socket.timeout):
+                raise urllib.error.URLError(f"timed out ({e})")
+            raise urllib.error.URLError(e)
+
+        metrics.increment(f"http.status.{response.status}")
+        if response.status in REDIRECT_CODES and response.headers.get('Location'):
+            location = urllib.parse.urljoin(url, response.headers['Location'])
+            response.read(ERROR_BODY_LIMIT)
+            response.close()
+            if response.status == 303 or (response.status in (301, 302) and method == 'POST'):
+                method, body = 'GET', None
+            url = location
+            continue
+
+        if 200 <= response.status < 300:
+            if limit is not None:
+                try:
+                    _check_length(response, limit)
+                except ResponseTooLarge:
+                    response.close()
+                    raise
+                response.limit = limit
+            return response
+
+        with response:
+            error_body = response.read(ERROR_BODY_LIMIT)
+        raise urllib.error.HTTPError(url, response.status, response.reason, response.headers,
+                                     io.BytesIO(error_body))
+
+    raise urllib.error.HTTPError(url, response.status, 'Too many redirects', response.headers, io.BytesIO())
+
+def urlopen(req, timeout=10, limit=None):
+    """Drop-in replacement for urllib.request.urlopen using pooled connections"""
+    if isinstance(req, str):
+        return request('GET', req, timeout=timeout, limit=limit)
+    return request(req.get_method(), req.full_url, dict(req.header_items()), req.data, timeout, limit)
@@ -0,0 +1,271 @@
+"""
+Record/replay transport under http_client, for offline and repeatable runs.
+
+With HTTP_REPLAY=record every request still goes to the network, and each
+response (status, headers such as Link and X-RateLimit-Remaining, and the
+body as sent, still compressed) is appended to the cassette HTTP_CASSETTE
+as one JSON line (gzipped when the name ends in .gz). The first recording
+of a process starts the cassette over, and request headers are never
+written, so tokens stay out of it.
+
+With HTTP_REPLAY=replay nothing touches the network. A request is matched
+by method, URL and a hash of its body. Repeated requests get the recorded
+responses in order, then the last one again. A request that was not
+recorded fails like an unreachable server. Replay can add faults, all
+derived from HTTP_REPLAY_SEED and the request itself, so a run is
+repeatable whatever the thread scheduling:
+
+    HTTP_REPLAY_LATENCY      seconds before each response's headers arrive
+    HTTP_REPLAY_BANDWIDTH    body bytes per second (0 = unlimited)
+    HTTP_REPLAY_ERROR_RATE   share of requests answered with an injected error
+    HTTP_REPLAY_ERRORS       statuses to inject, e.g. "403,502" (403 is a
+                             rate limit with Retry-After HTTP_REPLAY_RETRY_AFTER)
+
+The jitter of retry backoffs is drawn from the same seed while replaying
+(see jitter_random), so the waits repeat too. A recorded body longer than
+HTTP_REPLAY_MAX_BYTES (as sent, still compressed) fails the request with
+http_client.ResponseTooLarge instead of being written to the cassette.
+
+Run with HTTP_CACHE=0 when recording and replaying, so that requests are
+not answered from (or made conditional on) the local HTTP cache.
+"""
+
+import os
+import threading
+import time
+
+import metrics
+
+MODE = os.environ.get('HTTP_REPLAY', '').strip().lower()
+CASSETTE_PATH = os.environ.get('HTTP_CASSETTE', os.path.join('.cache', 'http-cassette.jsonl.gz'))
+LATENCY = float(os.environ.get('HTTP_REPLAY_LATENCY', '0'))
+BANDWIDTH = float(os.environ.get('HTTP_REPLAY_BANDWIDTH', '0'))
+ERROR_RATE = float(os.environ.get('HTTP_REPLAY_ERROR_RATE', '0'))
+ERROR_STATUSES = [int(status) for status in os.environ.get('HTTP_REPLAY_ERRORS', '502').split(',') if status.strip()]
+RETRY_AFTER = os.environ.get('HTTP_REPLAY_RETRY_AFTER', '1')
+SEED = os.environ.get('HTTP_REPLAY_SEED', '0')
+# Largest body recorded, in bytes as sent
+MAX_RECORDED_BYTES = int(os.environ.get('HTTP_REPLAY_MAX_BYTES', str(10 * 1024 * 1024)))
+
+# Response headers that are never written to a cassette
+DROPPED_HEADERS = {'set-cookie'}
+
+INJECTED_ERRORS = {
+    403: ('Forbidden', b'{"message": "API rate limit exceeded (injected)"}'),
+    429: ('Too Many Requests', b'{"message": "Too many requests (injected)"}'),
+    500: ('Internal Server Error', b'Internal Server Error (injected)'),
+    502: ('Bad Gateway', b'Bad Gateway (injected)'),
+    503: ('Service Unavailable', b'Service Unavailable (injected)'),
+    504: ('Gateway Timeout', b'Gateway Timeout (injected)'),
+}
+
+def request_key(method, url, body):
+    """What a recorded response is matched on: method, URL and a hash of the body"""
+    import hashlib
+
+    digest = hashlib.sha256(body).hexdigest()[:16] if body else ''
+    return f"{method.upper()} {url} {digest}"
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        import gzip
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def _headers(pairs):
+    import http.client
+
+    headers = http.client.HTTPMessage()
+    for name, value in pairs:
+        headers[name] = value
+    return headers
+
+class RecordedResponse:
+    """Stands in for http.client.HTTPResponse, serving a body from memory
+
+    The body is handed out at most bandwidth bytes per second when a
+    bandwidth is set.
+    """
+
+    will_close = False
+
+    def __init__(self, status, reason, header_pairs, body, bandwidth=0):
+        self.status = status
+        self.reason = reason
+        self.headers = _headers(header_pairs)
+        self._body = body
+        self._position = 0
+        self._bandwidth = bandwidth
+
+    def read(self, amt=None):
+        end = len(self._body) if amt is None else min(len(self._body), self._position + amt)
+        chunk = self._body[self._position:end]
+        self._position = end
+        if self._bandwidth and chunk:
+            time.sleep(len(chunk) / self._bandwidth)
+        return chunk
+
+    def isclosed(self):
+        return self._position >= len(self._body)
+
+    def close(self):
+        self._position = len(self._body)
+
+class Transport:
+    """Records responses to, or replays them from, one cassette"""
+
+    def __init__(self, mode, path=None, latency=LATENCY, bandwidth=BANDWIDTH, error_rate=ERROR_RATE,
+                 error_statuses=None, seed=SEED, retry_after=RETRY_AFTER, max_bytes=MAX_RECORDED_BYTES):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"unknown HTTP_REPLAY mode: {mode!r}")
+        self.mode = mode
+        self.path = path or CASSETTE_PATH
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses or ERROR_STATUSES
+        self.seed = seed
+        self.retry_after = retry_after
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._started = False
+        self._recorded = {}
+        self._attempts = {}
+        self._served = {}
+        if mode == 'replay':
+            self._load()
+
+    def _load(self):
+        import base64
+        import json
+
+        try:
+            with _open(self.path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entry['body'] = base64.b64decode(entry['body'])
+                        self._recorded.setdefault(entry['key'], []).append(entry)
+        except OSError as e:
+            print(f"Warning: could not read cassette {self.path}: {e}")
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._recorded.values())
+
+    # http_client hands replayed responses back to their "pool" when they are read to the end
+    def put(self, conn):
+        pass
+
+    def send(self, method, url, headers, body, timeout):
+        """Return an http_client.Response for the request, recorded or replayed"""
+        if self.mode == 'record':
+            return self._record(method, url, headers, body, timeout)
+        return self._replay(method, url, body, timeout)
+
+    def _response(self, url, raw):
+        import http_client
+
+        return http_client.Response(url, raw, raw, self)
+
+    def _record(self, method, url, headers, body, timeout):
+        import base64
+        import json
+        import http_client
+
+        live = http_client.send_live(method, url, headers, body, timeout)
+        try:
+            data = live.read_raw(self.max_bytes)
+        finally:
+            live.close()
+
+        pairs = [(name, value) for name, value in live.headers.items() if name.lower() not in DROPPED_HEADERS]
+        entry = {'key': request_key(method, url, body), 'status': live.status, 'reason': live.reason,
+                 'headers': pairs, 'body': base64.b64encode(data).decode('ascii')}
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with _open(self.path, 'a' if self._started else 'w') as f:
+                f.write(line)
+            self._started = True
+        metrics.increment('replay.recorded')
+        return self._response(url, RecordedResponse(live.status, live.reason, pairs, data))
+
+    def _injected_status(self, key, attempt):
+        """The error status to answer this attempt of key with, or None"""
+        if not self.error_rate or not self.error_statuses:
+            return None
+        import random
+
+        rng = random.Random(f"{self.seed}:{key}:{attempt}")
+        if rng.random() >= self.error_rate:
+            return None
+        return rng.choice(self.error_statuses)
+
+    def _replay(self, method, url, body, timeout):
+        key = request_key(method, url, body)
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+
+        if self.latency:
+            if timeout is not None and self.latency > timeout:
+                import socket
+
+                time.sleep(timeout)
+                raise socket.timeout('timed out')
+            time.sleep(self.latency)
+
+        status = self._injected_status(key, attempt)
+        if status is not None:
+            metrics.increment('replay.injected_errors')
+            reason, error_body = INJECTED_ERRORS.get(status, ('Injected Error', b'Injected error'))
+            pairs = [('Content-Type', 'application/json' if error_body.startswith(b'{') else 'text/plain')]
+            if status in (403, 429):
+                pairs += [('Retry-After', self.retry_after), ('X-RateLimit-Remaining', '0')]
+            return self._response(url, RecordedResponse(status, reason, pairs, error_body, self.bandwidth))
+
+        entries = self._recorded.get(key)
+        if not entries:
+            raise ConnectionRefusedError(f"no recorded response for {method} {url}")
+        with self._lock:
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        entry = entries[min(index, len(entries) - 1)]
+        metrics.increment('replay.served')
+        return self._response(url, RecordedResponse(entry['status'], entry['reason'], entry['headers'],
+                                                    entry['body'], self.bandwidth))
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport():
+    """Return the transport configured by HTTP_REPLAY, or None for the live network"""
+    global _transport
+    if not MODE:
+        return None
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport(MODE)
+    return _transport
+
+def jitter_random(method, url, body, attempt):
+    """A random.Random for the backoff before retrying a request, or None when not replaying
+
+    It is seeded from HTTP_REPLAY_SEED, the request and the attempt, so every
+    replay of a run draws the same waits.
+    """
+    transport = get_transport()
+    if transport is None or transport.mode != 'replay':
+        return None
+    import random
+
+    return random.Random(f"{transport.seed}:backoff:{request_key(method, url, body)}:{attempt}")
+
+def set_transport(transport):
+    """Use transport for every request from now on (None = the live network)"""
+    global _transport, MODE
+    with _transport_lock:
+        _transport = transport
+        MODE = transport.mode if transport is not None else ''
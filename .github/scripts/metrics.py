@@ -0,0 +1,103 @@
+"""
+Run metrics shared by the update scripts: stage timers, counters and gauges.
+
+Stages are timed with time.monotonic() and accumulate (total seconds, calls,
+slowest call) under dotted names such as "http.connect" or "blog.parse".
+Stages can nest: a streaming parse includes the body download it drives.
+Counters count events (HTTP requests, retries, cache hits) and gauges keep
+the latest and lowest value seen (rate-limit headroom). write() dumps
+everything as JSON to METRICS_PATH at the end of a run.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Where write() puts the metrics of a run (empty = do not write); the workflows
+# point it outside .cache, which is restored from earlier runs
+METRICS_PATH = os.environ.get('METRICS_PATH', os.path.join('.cache', 'metrics.json'))
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_gauges = {}
+_started_at = time.time()
+_started = time.monotonic()
+
+def add_time(stage, seconds):
+    """Add one timed call of seconds to stage"""
+    with _lock:
+        entry = _stages.get(stage)
+        if entry is None:
+            _stages[stage] = {'seconds': seconds, 'count': 1, 'max': seconds}
+        else:
+            entry['seconds'] += seconds
+            entry['count'] += 1
+            entry['max'] = max(entry['max'], seconds)
+
+@contextlib.contextmanager
+def timer(stage):
+    """Time the body of a with block as one call of stage"""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        add_time(stage, time.monotonic() - start)
+
+def increment(counter, amount=1):
+    with _lock:
+        _counters[counter] = _counters.get(counter, 0) + amount
+
+def gauge(name, value):
+    """Record the current value of name, keeping the lowest value seen"""
+    with _lock:
+        entry = _gauges.get(name)
+        if entry is None:
+            _gauges[name] = {'last': value, 'min': value}
+        else:
+            entry['last'] = value
+            entry['min'] = min(entry['min'], value)
+
+def snapshot():
+    """Return everything recorded so far as a JSON-serializable dict"""
+    with _lock:
+        return {
+            'script': os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+            'started_at': _started_at,
+            'wall_seconds': time.monotonic() - _started,
+            'stages': {name: dict(entry) for name, entry in sorted(_stages.items())},
+            'counters': dict(sorted(_counters.items())),
+            'gauges': {name: dict(entry) for name, entry in sorted(_gauges.items())}
+        }
+
+def reset():
+    """Forget everything recorded so far"""
+    global _started_at, _started
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _gauges.clear()
+        _started_at = time.time()
+        _started = time.monotonic()
+
+def write(path=None):
+    """Write the run's metrics as JSON to path (default METRICS_PATH)"""
+    path = METRICS_PATH if path is None else path
+    if not path:
+        return False
+
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error writing metrics to {path}: {e}")
+        return False
@@ -0,0 +1,203 @@
+"""
+Rate-limit-aware request scheduler for the GitHub API client.
+
+Each API resource (core, search, graphql) gets a token bucket whose level is
+taken from the X-RateLimit-Remaining / X-RateLimit-Reset headers of the last
+response. Requests wait for a token in priority order, so discovery calls go
+before detail calls. Once the remaining budget runs low requests are spread
+evenly over the time left until the reset, and when it is exhausted, or the
+server asks us to back off (Retry-After, secondary rate limits), everyone
+waits instead of failing.
+"""
+
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+import metrics
+
+# Lower numbers are scheduled first
+PRIORITY_DISCOVERY = 0
+PRIORITY_DETAIL = 1
+
+# Below this many remaining requests, pace them out until the reset
+PACING_THRESHOLD = int(os.environ.get('RATE_LIMIT_PACING_THRESHOLD', '50'))
+# Give up instead of waiting for a reset further away than this (seconds)
+MAX_RATE_LIMIT_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', '900'))
+# GitHub asks clients to wait at least a minute after a secondary rate limit
+SECONDARY_RATE_LIMIT_WAIT = 60
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+def resource_for(url):
+    """Return the GitHub rate-limit resource a request URL counts against"""
+    if '/search/' in url:
+        return 'search'
+    if url.rstrip('/').endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+def backoff_delay(retry_count, base=BACKOFF_BASE, cap=BACKOFF_CAP, rng=None):
+    """Exponential backoff with full jitter, drawn from rng (default: the random module)"""
+    return (rng or random).uniform(0, min(cap, base * 2 ** retry_count))
+
+def retry_after_seconds(headers):
+    """Return the Retry-After delay in seconds, if the header is present"""
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+def rate_limit_wait(status, headers, body=''):
+    """Return how long to wait before retrying a 403/429, or None if it is not a rate limit"""
+    if status not in (403, 429):
+        return None
+
+    retry_after = retry_after_seconds(headers)
+    if retry_after is not None:
+        return retry_after
+
+    if headers and headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset'):
+        return max(0.0, int(headers['X-RateLimit-Reset']) - time.time()) + 1
+
+    if 'secondary rate limit' in (body or '').lower() or status == 429:
+        return SECONDARY_RATE_LIMIT_WAIT
+
+    return None
+
+class RequestScheduler:
+    """Token bucket for one rate-limit resource with a priority wait queue"""
+
+    def __init__(self, pacing_threshold=PACING_THRESHOLD, resource='core'):
+        self.pacing_threshold = pacing_threshold
+        self.resource = resource
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.paused_until = 0.0
+        self._last_start = 0.0
+        self._queue = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        """Assume a fresh budget once an exhausted window has reset"""
+        if self.remaining is not None and self.remaining <= 0 and self.reset_at is not None \
+                and now >= self.reset_at + 1:
+            self.remaining = self.limit
+            self.reset_at = None
+
+    def _ready_at(self, now):
+        """Return the earliest time the next request may start"""
+        ready = self.paused_until
+        if self.remaining is None or self.reset_at is None:
+            return ready
+
+        if self.remaining <= 0:
+            return max(ready, self.reset_at + 1)
+
+        if self.remaining < self.pacing_threshold:
+            interval = max(0.0, self.reset_at - now) / self.remaining
+            ready = max(ready, self._last_start + interval)
+
+        return ready
+
+    def _withdraw(self, ticket):
+        """Remove a waiter that gives up; call with the condition held"""
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._cond.notify_all()
+
+    def acquire(self, priority=PRIORITY_DETAIL, timeout=None):
+        """Block until this request may start; higher priority waiters go first
+
+        Returns True, or False when the request could not start within timeout seconds.
+        """
+        start = time.monotonic()
+        give_up_at = None if timeout is None else time.time() + timeout
+        with self._cond:
+            ticket = (priority, next(self._counter))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.time()
+                    self._refill(now)
+                    ready_at = self._ready_at(now)
+                    if self._queue[0] == ticket and now >= ready_at:
+                        break
+                    if give_up_at is not None and now >= give_up_at:
+                        self._withdraw(ticket)
+                        metrics.add_time(f"rate_limit.{self.resource}.wait", time.monotonic() - start)
+                        return False
+
+                    # Our turn: wait until ready; otherwise until notified. Never past give_up_at.
+                    wake_at = ready_at if self._queue[0] == ticket else give_up_at
+                    if give_up_at is not None:
+                        wake_at = min(wake_at, give_up_at)
+                    self._cond.wait(None if wake_at is None else wake_at - now)
+            except BaseException:
+                self._withdraw(ticket)
+                raise
+
+            heapq.heappop(self._queue)
+            if self.remaining is not None:
+                self.remaining -= 1
+            self._last_start = time.time()
+            self._cond.notify_all()
+
+        metrics.add_time(f"rate_limit.{self.resource}.wait", time.monotonic() - start)
+        return True
+
+    def update(self, headers):
+        """Refresh the bucket from a response's X-RateLimit-* headers"""
+        if not headers:
+            return
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        limit = headers.get('X-RateLimit-Limit')
+        if remaining is None or reset is None:
+            return
+
+        try:
+            remaining, reset = int(remaining), int(reset)
+            limit = int(limit) if limit is not None else None
+        except ValueError:
+            return
+
+        metrics.gauge(f"rate_limit.{self.resource}.remaining", remaining)
+        with self._cond:
+            if reset == self.reset_at and self.remaining is not None:
+                # Responses can arrive out of order; within a window the lowest count is current
+                remaining = min(remaining, self.remaining)
+            self.remaining = remaining
+            self.reset_at = reset
+            self.limit = limit or self.limit
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Hold back every request on this resource for the given number of seconds"""
+        metrics.increment(f"rate_limit.{self.resource}.pauses")
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+            self._cond.notify_all()
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(url):
+    """Return the shared scheduler for the resource url counts against"""
+    resource = resource_for(url)
+    with _schedulers_lock:
+        if resource not in _schedulers:
+            _schedulers[resource] = RequestScheduler(resource=resource)
+        return _schedulers[resource]
@@ -0,0 +1,206 @@
+"""
+Single-pass README section renderer shared by the update scripts.
+
+Sections are delimited by <!-- NAME-START --> / <!-- NAME-END --> markers.
+The README is read once, every marker offset is indexed in one scan, and any
+number of section updates are spliced in together. The result is written
+atomically (temp file + rename) and only when it differs from what is on disk.
+
+The last good rendering of every section is also kept under
+SECTION_CACHE_DIR, so a source that fails or misses the run's deadline can
+fall back to it instead of leaving the section out.
+"""
+
+import os
+import re
+
+import fingerprint
+import metrics
+
+MARKER_PATTERN = re.compile(r'<!-- ([A-Z0-9][A-Z0-9-]*)-(START|END) -->')
+# A markdown horizontal rule at the end of the text before a section, or at the start of the text after it
+RULE_BEFORE = re.compile(r'(?:^|\n)---$')
+RULE_AFTER = re.compile(r'---(?:\n|$)')
+# Last good rendering of each section (empty = not kept)
+SECTION_CACHE_DIR = os.environ.get('SECTION_CACHE_DIR', os.path.join('.cache', 'sections'))
+
+def start_marker(name):
+    return f"<!-- {name}-START -->"
+
+def end_marker(name):
+    return f"<!-- {name}-END -->"
+
+def index_markers(text):
+    """Map each section name to the (start, end) offsets of its body
+
+    start is just after the START marker and end is where the END marker
+    begins. Sections with a START but no END marker map to None.
+    """
+    sections = {}
+    for match in MARKER_PATTERN.finditer(text):
+        name, kind = match.group(1), match.group(2)
+        if kind == 'START':
+            sections.setdefault(name, [match.end(), None])
+        elif name in sections and sections[name][1] is None:
+            sections[name][1] = match.start()
+
+    return {name: tuple(span) if span[1] is not None else None for name, span in sections.items()}
+
+def render(text, sections, anchors=None):
+    """Return text with every section in sections replaced by its new content
+
+    Sections missing from text are inserted just before their anchor string
+    (see anchors) when it is present, otherwise appended at the end.
+    """
+    anchors = anchors or {}
+    markers = index_markers(text)
+
+    replacements = []
+    missing = []
+    for name, content in sections.items():
+        if name not in markers:
+            missing.append((name, content))
+        elif markers[name] is None:
+            print(f"Warning: {start_marker(name)} has no matching end marker, leaving it untouched")
+        else:
+            start, end = markers[name]
+            replacements.append((start, end, f"\n{content}"))
+
+    parts = []
+    position = 0
+    for start, end, content in sorted(replacements):
+        parts.append(text[position:start])
+        parts.append(content)
+        position = end
+    parts.append(text[position:])
+    text = ''.join(parts)
+
+    for name, content in missing:
+        block = f"{start_marker(name)}\n{content}{end_marker(name)}\n"
+        anchor = anchors.get(name)
+        index = text.find(anchor) if anchor else -1
+        if index >= 0:
+            text = f"{text[:index]}\n{block}{text[index:]}"
+        else:
+            text = text.rstrip()
+            if not text.endswith('\n'):
+                text += '\n'
+            text += f"\n{block}"
+
+    return text
+
+def remove(text, names):
+    """Return text without the sections in names, markers included
+
+    When a removed section sat between two horizontal rules, one of the
+    rules goes with it.
+    """
+    for name in names:
+        span = index_markers(text).get(name)
+        if not span:
+            continue
+        before = text[:span[0] - len(start_marker(name))].rstrip()
+        after = text[span[1] + len(end_marker(name)):].lstrip()
+        if RULE_BEFORE.search(before) and RULE_AFTER.match(after):
+            after = after[3:].lstrip()
+        if not before:
+            text = after
+        else:
+            text = f"{before}\n\n{after}" if after else f"{before}\n"
+    return text
+
+def write_atomic(path, content):
+    """Write content to path through a temp file in the same directory and a rename"""
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.readme-', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except OSError:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def section_path(name):
+    return os.path.join(SECTION_CACHE_DIR, f"{name}.md")
+
+def save_section(name, content):
+    """Keep content as the last good rendering of section name"""
+    if not SECTION_CACHE_DIR:
+        return
+    try:
+        path = section_path(name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, content)
+    except OSError as e:
+        print(f"Warning: could not save the {name} section: {e}")
+
+def load_section(name):
+    """Return the last good rendering of section name, or None"""
+    if not SECTION_CACHE_DIR:
+        return None
+    try:
+        with open(section_path(name), 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def fallback(name, label, sources, content=None):
+    """Return (content, digest) for a run whose source failed, like the scripts' build_section
+
+    content is what the script could still render (e.g. from its feed
+    archive); without it the last good rendering of section name is used.
+    The digest covers the content and sources, and content is
+    fingerprint.UNCHANGED when it matches the last run. Returns (None, None)
+    when there is nothing to fall back to. label names the script in
+    messages and in the "<label>.fallback" counter.
+    """
+    if content is None:
+        content = load_section(name)
+        if content is None:
+            return None, None
+        print(f"Using the last good {label} section")
+
+    metrics.increment(f"{label}.fallback")
+    digest = fingerprint.compute(content, *sources)
+    if fingerprint.is_unchanged(name, digest):
+        print("Fallback section unchanged since last run, skipping README update")
+        return fingerprint.UNCHANGED, digest
+    return content, digest
+
+def update_readme(path, sections, anchors=None):
+    """Splice sections into the README at path in a single read/write cycle"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            readme_content = f.read()
+
+        with metrics.timer('readme.render'):
+            updated_content = render(readme_content, sections, anchors)
+
+        if updated_content == readme_content:
+            print("README.md already up to date")
+            return True
+
+        with metrics.timer('readme.write'):
+            write_atomic(path, updated_content)
+
+        print("README.md updated successfully")
+        return True
+    except Exception as e:
+        print(f"Error updating README: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
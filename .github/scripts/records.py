@@ -0,0 +1,133 @@
+"""
+Compact record types for blog posts, videos and repositories.
+
+Each record keeps its fields in __slots__ instead of a per-item dict, and
+the display values (formatted date, truncated description) are computed
+once when the record is built. top_k() picks the largest records with a
+heap instead of sorting everything, and merge_latest() merges several
+newest-first feeds into one without duplicates.
+"""
+
+import heapq
+
+REPO_DESCRIPTION_LENGTH = 120
+NO_DESCRIPTION = 'No description available'
+
+class Record:
+    """Base class: equality, repr and dict conversion over FIELDS"""
+
+    __slots__ = ()
+    # Constructor arguments, in order; to_dict()/from_dict() round-trip these
+    FIELDS = ()
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.FIELDS if name in data})
+
+class Post(Record):
+    """A blog post with its display date, plain text summary, published datetime and GUID"""
+
+    __slots__ = ('title', 'link', 'date', 'summary', 'published', 'guid')
+    FIELDS = __slots__
+    # The field holding the entry's text, for storage that keeps one text column
+    TEXT_FIELD = 'summary'
+
+    def __init__(self, title='', link='', date='Unknown', summary='', published=None, guid=''):
+        self.title = title
+        self.link = link
+        self.date = date
+        self.summary = summary
+        self.published = published
+        self.guid = guid
+
+class Video(Record):
+    """A video with its display date, plain text description, published datetime and video id"""
+
+    __slots__ = ('title', 'link', 'date', 'description', 'published', 'guid')
+    FIELDS = __slots__
+    TEXT_FIELD = 'description'
+
+    def __init__(self, title='', link='', date='Unknown', description='', published=None, guid=''):
+        self.title = title
+        self.link = link
+        self.date = date
+        self.description = description
+        self.published = published
+        self.guid = guid
+
+def summarize_description(description, max_length=REPO_DESCRIPTION_LENGTH):
+    """One-line repository description cut at a word boundary"""
+    if not description:
+        return NO_DESCRIPTION
+    description = description.replace('\n', ' ').replace('\r', ' ')
+    if len(description) > max_length:
+        description = description[:max_length].rsplit(' ', 1)[0] + '...'
+    return description
+
+class RepoInfo(Record):
+    """A repository's details plus its precomputed one-line summary"""
+
+    __slots__ = ('name', 'full_name', 'description', 'html_url', 'stars', 'forks', 'language', 'is_fork',
+                 'summary')
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, name='', full_name='', description=None, html_url='', stars=0, forks=0, language=None,
+                 is_fork=False):
+        self.name = name
+        self.full_name = full_name
+        self.description = description
+        self.html_url = html_url
+        self.stars = stars or 0
+        self.forks = forks or 0
+        self.language = language
+        self.is_fork = is_fork
+        self.summary = summarize_description(description)
+
+def star_key(repo):
+    """Sort key shared by everything that ranks repositories"""
+    return repo.stars
+
+def name_key(record):
+    """Case-insensitive full name, for a stable order independent of discovery"""
+    return record.full_name.lower()
+
+def top_k(records, k, key=star_key):
+    """The k largest records by key, largest first; ties keep their input order"""
+    return heapq.nlargest(k, records, key=key)
+
+def published_key(record):
+    """Sort key for posts and videos by publish time; undated entries sort oldest"""
+    return record.published.timestamp() if record.published else float('-inf')
+
+def merge_latest(streams, k, key=published_key):
+    """The k newest records across streams that are each sorted newest first
+
+    A k-way heap merge that stops after k records (k=None takes them all).
+    A record whose guid (or link, when it has none) was already taken is
+    skipped, so an entry that appears in several streams is kept once.
+    """
+    seen = set()
+    latest = []
+    for record in heapq.merge(*streams, key=key, reverse=True):
+        identity = record.guid or record.link
+        if identity in seen:
+            continue
+        seen.add(identity)
+        latest.append(record)
+        if k is not None and len(latest) >= k:
+            break
+    return latest
@@ -0,0 +1,195 @@
+"""
+Content-addressed cache of rendered markdown sections.
+
+A section is keyed by a SHA-256 of its name, the source of the modules it is
+rendered with (a script's RENDER_SOURCES) and its normalized input (feed
+bodies, records and formatting arguments), so the same input always maps to
+the same key and a changed entry or rendering code always misses. A hit skips everything that turns the input into markdown,
+which for a feed means parsing and summarizing it. Finished sections are
+kept in memory and as UTF-8 files under RENDER_CACHE_DIR, shared by worker
+processes and kept across runs by the Actions cache; the least recently
+used files are removed beyond RENDER_CACHE_MAX_ENTRIES. Hits and misses are
+counted per cache and in the run metrics.
+"""
+
+import hashlib
+import os
+import threading
+
+import fingerprint
+import metrics
+
+CACHE_ENABLED = os.environ.get('RENDER_CACHE', '1') != '0'
+# Directory of rendered sections (empty = keep them in memory only)
+CACHE_DIR = os.environ.get('RENDER_CACHE_DIR', os.path.join('.cache', 'render'))
+MAX_ENTRIES = int(os.environ.get('RENDER_CACHE_MAX_ENTRIES', '512'))
+
+SUFFIX = '.md'
+# Stores between scans of the directory for files to prune
+PRUNE_EVERY = 64
+
+def normalize(value):
+    """Canonical form of a record, datetime or container, with stable repr()
+
+    Records become (type name, field values), aware datetimes become UTC ISO
+    strings and lists become tuples.
+    """
+    if hasattr(value, 'FIELDS'):
+        return (type(value).__name__,) + tuple(normalize(getattr(value, name)) for name in value.FIELDS)
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), normalize(item)) for key, item in value.items()))
+    if hasattr(value, 'isoformat'):
+        if getattr(value, 'tzinfo', None) is not None:
+            from datetime import timezone
+
+            value = value.astimezone(timezone.utc)
+        return value.isoformat()
+    return value
+
+_source_digests = {}
+_source_digests_lock = threading.Lock()
+
+def source_digest(sources):
+    """Digest of the files in sources, read once per process"""
+    sources = tuple(sources)
+    with _source_digests_lock:
+        digest = _source_digests.get(sources)
+        if digest is None:
+            digest = _source_digests[sources] = fingerprint.compute(b'', *sources)
+    return digest
+
+def cache_key(name, sources, inputs, *params):
+    """Hex key of a section: name, rendering source files, inputs and formatting arguments
+
+    Each input is either bytes (a feed body, hashed as is) or records and
+    plain values, hashed in normalized form.
+    """
+    digest = hashlib.sha256(repr((name, source_digest(sources), normalize(params))).encode('utf-8'))
+    for value in inputs:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            data = value
+        else:
+            data = repr(normalize(value)).encode('utf-8')
+        # Length-prefixed so inputs cannot run into each other
+        digest.update(b'%d:' % len(data))
+        digest.update(data)
+    return digest.hexdigest()
+
+class RenderCache:
+    """Rendered sections by key, in memory and (optionally) on disk"""
+
+    def __init__(self, directory=CACHE_DIR, max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stores = 0
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key):
+        """The section stored under key, or None"""
+        with self._lock:
+            content = self._memory.get(key)
+        if content is not None or not self.directory:
+            return content
+
+        try:
+            with open(self._path(key), 'rb') as f:
+                content = f.read().decode('utf-8')
+            # The file's mtime is its last use, for pruning
+            os.utime(self._path(key))
+        except (OSError, UnicodeDecodeError):
+            return None
+        with self._lock:
+            self._memory[key] = content
+        return content
+
+    def put(self, key, content):
+        with self._lock:
+            self._memory[key] = content
+            self._stores += 1
+            prune = self._stores % PRUNE_EVERY == 1
+        if not self.directory:
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content.encode('utf-8'))
+            os.replace(tmp_path, self._path(key))
+            if prune:
+                self._prune()
+        except OSError as e:
+            print(f"Warning: could not store rendered section: {e}")
+
+    def _prune(self):
+        """Remove the least recently used files beyond max_entries"""
+        with os.scandir(self.directory) as entries:
+            files = [entry for entry in entries if entry.name.endswith(SUFFIX)]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def render(self, name, sources, inputs, build, *params):
+        """Return build(inputs, *params), reusing the section rendered before from the same input
+
+        build may return None (nothing to render), which is not cached.
+        """
+        inputs = list(inputs)
+        key = cache_key(name, sources, inputs, *params)
+        content = self.get(key)
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if content is not None:
+            metrics.increment('render_cache.hits')
+            return content
+
+        metrics.increment('render_cache.misses')
+        content = build(inputs, *params)
+        if content is not None:
+            self.put(key, content)
+        return content
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._memory)}
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the shared cache configured from the environment, or None if disabled"""
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = RenderCache(CACHE_DIR)
+    return _default_cache
+
+def render(name, sources, inputs, build, *params):
+    """Render a section through the shared cache, or directly when it is disabled"""
+    cache = get_cache()
+    if cache is None:
+        return build(list(inputs), *params)
+    return cache.render(name, sources, inputs, build, *params)
+
+def stats():
+    """Hits and misses of the shared cache so far"""
+    cache = get_cache()
+    return cache.stats() if cache else {'hits': 0, 'misses': 0, 'entries': 0}
@@ -0,0 +1,22 @@
+"""
+Import the hyphenated update-*.py scripts as regular modules.
+"""
+
+import importlib.util
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(name):
+    """Import scripts/<name>.py (e.g. 'update-blog-posts') and return the module"""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    path = os.path.join(SCRIPTS_DIR, f"{name}.py")
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
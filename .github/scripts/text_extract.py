@@ -0,0 +1,133 @@
+"""
+Single-pass text extraction for feed summaries and descriptions.
+
+HTML is run through a streaming html.parser.HTMLParser that drops tags and
+<script>/<style> content, decodes entities and collapses whitespace as it
+goes. Extraction stops as soon as enough visible characters have been
+collected for the requested summary length, so long full-content posts are
+never processed past their first paragraphs. The summary is cut on the
+decoded text and then has <, > and & escaped again, because it goes into
+markdown, where a decoded "&lt;div&gt;" would be taken for an HTML tag.
+"""
+
+import html
+import re
+from html.parser import HTMLParser
+
+# Tags whose boundaries separate words ("</p><p>" must not glue words together)
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'img', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'td',
+    'th', 'tr', 'ul'
+})
+# Tags whose content is never visible text
+SKIP_TAGS = frozenset({'script', 'style', 'template', 'noscript'})
+
+FEED_CHUNK_SIZE = 2048
+WORD_PATTERN = re.compile(r'\S+')
+
+class _EnoughText(Exception):
+    pass
+
+class _TextCollector(HTMLParser):
+    """Collect visible text as whitespace-collapsed words"""
+
+    def __init__(self, limit=None):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.words = []
+        self.length = 0
+        self.skip_depth = 0
+        self.separate = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.separate = True
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.separate = True
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            if self.skip_depth:
+                self.skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self.separate = True
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+
+        if data[:1].isspace():
+            self.separate = True
+
+        for match in WORD_PATTERN.finditer(data):
+            word = match.group()
+            if self.words and not self.separate:
+                # Inline markup split a word, e.g. "spec<em>ial</em>"
+                self.words[-1] += word
+                self.length += len(word)
+            else:
+                if self.words:
+                    self.length += 1
+                self.words.append(word)
+                self.length += len(word)
+            self.separate = True
+
+            if self.limit is not None and self.length > self.limit:
+                raise _EnoughText()
+
+        self.separate = data[-1:].isspace()
+
+def html_to_text(html_text, max_length=None):
+    """Return the visible text of html_text with whitespace collapsed
+
+    With max_length set, extraction stops once more than max_length characters
+    are known, which is all truncate() needs.
+    """
+    if not html_text:
+        return ''
+
+    collector = _TextCollector(max_length)
+    try:
+        for start in range(0, len(html_text), FEED_CHUNK_SIZE):
+            collector.feed(html_text[start:start + FEED_CHUNK_SIZE])
+        collector.close()
+    except _EnoughText:
+        pass
+    return ' '.join(collector.words)
+
+def collapse_whitespace(text, max_length=None):
+    """Return plain text with runs of whitespace collapsed to single spaces"""
+    if not text:
+        return ''
+
+    words = []
+    length = -1
+    for match in WORD_PATTERN.finditer(text):
+        words.append(match.group())
+        length += len(words[-1]) + 1
+        if max_length is not None and length > max_length:
+            break
+    return ' '.join(words)
+
+def truncate(text, max_length):
+    """Cut text to max_length at a word boundary, marking the cut with '...'"""
+    if len(text) > max_length:
+        text = text[:max_length].rsplit(' ', 1)[0] + '...'
+    return text
+
+def summarize_html(html_text, max_length=150):
+    """Plain text summary of an HTML fragment, with <, > and & escaped for markdown
+
+    Escaping after the cut means a cut never lands inside an entity.
+    """
+    return html.escape(truncate(html_to_text(html_text, max_length), max_length), quote=False)
+
+def summarize_text(text, max_length=150):
+    """Plain text summary of already plain text"""
+    return truncate(collapse_whitespace(text, max_length), max_length)
@@ -0,0 +1,89 @@
+"""
+Feed timestamp parsing shared by the feed scripts.
+
+RSS dates are RFC 2822 ("Tue, 02 Jan 2024 10:00:00 +0000") and Atom dates
+are ISO 8601 ("2024-01-02T10:00:00Z"). A FeedDates parser detects the format
+from the first timestamp of a feed and keeps using that parser for the rest
+of it, so no entry pays for a failed parse and its exception. Parsed values
+are kept in a bounded LRU cache, and every result is a timezone-aware
+datetime so entries from different feeds can be sorted by time.
+"""
+
+import functools
+import os
+
+RFC_2822 = 'rfc2822'
+ISO_8601 = 'iso8601'
+DISPLAY_FORMAT = '%B %d, %Y'
+# Parsed timestamps kept per format; a feed rarely has more than a few hundred
+CACHE_SIZE = int(os.environ.get('TIMESTAMP_CACHE_SIZE', '4096'))
+
+def _as_utc(value):
+    """Treat timestamps without an offset as UTC so every result is comparable"""
+    if value.tzinfo is None:
+        from datetime import timezone
+
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_rfc2822(text):
+    """Parse an RFC 2822 date, or return None"""
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return _as_utc(parsedate_to_datetime(text))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_iso8601(text):
+    """Parse an ISO 8601 date, or return None"""
+    from datetime import datetime
+
+    try:
+        return _as_utc(datetime.fromisoformat(text.replace('Z', '+00:00')))
+    except ValueError:
+        return None
+
+PARSERS = {RFC_2822: parse_rfc2822, ISO_8601: parse_iso8601}
+
+def detect_format(text):
+    """Guess a timestamp's format from its first character: ISO dates start with the year"""
+    return ISO_8601 if text[:1].isdigit() else RFC_2822
+
+class FeedDates:
+    """Parse the timestamps of one feed, detecting their format once"""
+
+    def __init__(self):
+        self.format = None
+
+    def parse(self, text):
+        """Return text as an aware datetime, or None when it is not a timestamp"""
+        if not text:
+            return None
+        text = text.strip()
+
+        if self.format is not None:
+            value = PARSERS[self.format](text)
+            if value is not None:
+                return value
+
+        # First timestamp, or one that does not match the feed's format
+        detected = detect_format(text)
+        for name in (detected, ISO_8601 if detected == RFC_2822 else RFC_2822):
+            if name == self.format:
+                continue
+            value = PARSERS[name](text)
+            if value is not None:
+                self.format = name
+                return value
+        return None
+
+def display(value, fallback='Unknown'):
+    """Format a parsed timestamp for the README, or return fallback when there is none"""
+    return value.strftime(DISPLAY_FORMAT) if value is not None else fallback
+
+def cache_info():
+    """Return {format: functools cache statistics}"""
+    return {name: parser.cache_info() for name, parser in PARSERS.items()}
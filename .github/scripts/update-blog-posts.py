@@ -3,14 +3,22 @@
 Script to fetch blog posts from RSS feed and update README.md
 """
 
-import xml.etree.ElementTree as ET
-import urllib.request
-import re
-from datetime import datetime
+import sys
+
+import feed_archive
+import feed_stream
+import fingerprint
+import http_cache
+import metrics
+import readme_sections
+import records
+import timestamps
 
 # Configuration
 RSS_URL = "https://blog.harikrishnan.io/blog/feed.xml"
 README_PATH = "README.md"
+SECTION = "BLOG-POSTS"
+RENDER_SOURCES = fingerprint.sources(__file__, 'feed_archive', 'feed_stream', 'records', 'text_extract', 'timestamps')
 NUM_POSTS = 5
 
 # XML namespaces
@@ -19,191 +27,252 @@ ns = {
     'content': 'http://purl.org/rss/1.0/modules/content/'
 }
 
-def fetch_rss_feed(url):
-    """Fetch RSS feed from URL"""
-    try:
-        if not url.startswith(('http://', 'https://')):
-            print(f"Invalid URL scheme: {url}")
-            return None
-
-        req = urllib.request.Request(url)
-        req.add_header('User-Agent', 'Mozilla/5.0 (GitHub-Profile-Updater)')
+ATOM_ENTRY = f"{{{ns['atom']}}}entry"
+ENTRY_TAGS = {ATOM_ENTRY, 'item'}
 
-        with urllib.request.urlopen(req, timeout=10) as response:
-            content_type = response.headers.get('Content-Type', '')
-            if not any(ct in content_type.lower() for ct in ['xml', 'rss', 'atom', 'application/xml', 'text/xml']):
-                print(f"Warning: Unexpected content type: {content_type}")
+def parse_atom_entry(entry, dates=None):
+    """Extract a Post from an Atom <entry>; dates is the feed's timestamps.FeedDates"""
+    title = entry.find('atom:title', ns)
+    link = entry.find('atom:link', ns)
+    pub_date = entry.find('atom:published', ns)
+    content = entry.find('atom:content', ns)
+    summary = entry.find('atom:summary', ns)
+    guid = entry.find('atom:id', ns)
 
-            content = response.read(5 * 1024 * 1024)
-            return content.decode('utf-8')
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error fetching RSS feed: {e.code} {e.reason}")
-        return None
-    except urllib.error.URLError as e:
-        print(f"URL Error fetching RSS feed: {e.reason}")
+    if title is None:
         return None
-    except Exception as e:
-        print(f"Error fetching RSS feed: {e}")
+
+    link_href = ''
+    if link is not None and link.get('href'):
+        link_href = link.get('href')
+
+    published, date = parse_date(pub_date, dates)
+    return records.Post(
+        title=title.text or '',
+        link=link_href,
+        date=date,
+        summary=extract_summary(
+            summary.text if summary is not None and summary.text else
+            content.text if content is not None and content.text else '',
+            150
+        ),
+        published=published,
+        guid=(guid.text or '') if guid is not None else ''
+    )
+
+def parse_rss_item(item, dates=None):
+    """Extract a Post from an RSS <item>; dates is the feed's timestamps.FeedDates"""
+    title = item.find('title')
+    link = item.find('link')
+    pub_date = item.find('pubDate')
+    description = item.find('description')
+    content = item.find('content:encoded', ns)
+    guid = item.find('guid')
+
+    if title is None or link is None:
         return None
 
-def parse_rss_feed(rss_content):
-    """Parse RSS/Atom feed and extract post information"""
+    published, date = parse_date(pub_date, dates)
+    return records.Post(
+        title=title.text or '',
+        link=link.text or '',
+        date=date,
+        summary=extract_summary(description.text or content.text or '', 150),
+        published=published,
+        guid=(guid.text or '') if guid is not None else ''
+    )
+
+def parse_rss_feed(rss_content, max_posts=NUM_POSTS, archived=None):
+    """Parse RSS/Atom feed and extract post information
+
+    rss_content is the whole document or an iterable of byte chunks. Entries
+    are parsed as they stream in and parsing stops after max_posts posts
+    (None = every post). archived tells whether a post is already in the
+    feed archive; when given, parsing goes on past max_posts until it
+    reaches an archived post, as the posts after it were archived before.
+    A feed larger than feed_stream.MAX_FEED_BYTES yields the posts parsed
+    before the limit was reached.
+    """
+    posts = []
     try:
-        root = ET.fromstring(rss_content)
-        posts = []
-
-        if 'http://www.w3.org/2005/Atom' in root.tag:
-            for entry in root.findall('atom:entry', ns):
-                title = entry.find('atom:title', ns)
-                link = entry.find('atom:link', ns)
-                pub_date = entry.find('atom:published', ns)
-                content = entry.find('atom:content', ns)
-                summary = entry.find('atom:summary', ns)
-
-                if title is not None:
-                    link_href = ''
-                    if link is not None and link.get('href'):
-                        link_href = link.get('href')
-
-                    post_data = {
-                        'title': title.text or '',
-                        'link': link_href,
-                        'date': parse_date(pub_date.text) if pub_date is not None else 'Unknown',
-                        'summary': extract_summary(
-                            summary.text if summary is not None and summary.text else
-                            content.text if content is not None and content.text else '',
-                            150
-                        )
-                    }
-                    posts.append(post_data)
-
-                    if len(posts) >= NUM_POSTS:
-                        break
-        else:
-            for item in root.findall('.//item'):
-                title = item.find('title')
-                link = item.find('link')
-                pub_date = item.find('pubDate')
-                description = item.find('description')
-                content = item.find('content:encoded', ns)
-
-                if title is not None and link is not None:
-                    post_data = {
-                        'title': title.text or '',
-                        'link': link.text or '',
-                        'date': parse_date(pub_date.text) if pub_date is not None else 'Unknown',
-                        'summary': extract_summary(description.text or content.text or '', 150)
-                    }
-                    posts.append(post_data)
-
-                    if len(posts) >= NUM_POSTS:
-                        break
+        chunks = feed_stream.iter_chunks(rss_content)
+        dates = timestamps.FeedDates()
+
+        for entry in feed_stream.iter_entries(chunks, ENTRY_TAGS):
+            if entry.tag == ATOM_ENTRY:
+                post_data = parse_atom_entry(entry, dates)
+            else:
+                post_data = parse_rss_item(entry, dates)
+
+            if post_data:
+                posts.append(post_data)
+
+                if max_posts is not None and len(posts) >= max_posts and (archived is None or archived(post_data)):
+                    break
 
         return posts
     except Exception as e:
+        import http_client
+
+        if posts and isinstance(e, (feed_stream.FeedTooLarge, http_client.ResponseTooLarge)):
+            print(f"Warning: {e}; keeping the {len(posts)} posts parsed before the limit")
+            return posts
         print(f"Error parsing feed: {e}")
         import traceback
         traceback.print_exc()
         return []
 
-def parse_date(date_string):
-    """Parse RFC 2822 date format and return formatted date"""
-    try:
-        # Parse RFC 2822 format
-        date_obj = datetime.strptime(date_string, '%a, %d %b %Y %H:%M:%S %z')
-        return date_obj.strftime('%B %d, %Y')
-    except Exception:
-        try:
-            # Try ISO format
-            date_obj = datetime.fromisoformat(date_string.replace('Z', '+00:00'))
-            return date_obj.strftime('%B %d, %Y')
-        except Exception:
-            return date_string
+def parse_date(element, dates=None):
+    """Return (published datetime or None, display date) for a date element
 
-def extract_summary(html_text, max_length=150):
-    """Extract plain text summary from HTML"""
-    if not html_text:
-        return ''
+    RFC 2822 and ISO 8601 dates are understood; anything else is displayed as is.
+    """
+    if element is None or not element.text:
+        return None, 'Unknown'
 
-    html_text = html_text[:10000]
+    published = (dates or timestamps.FeedDates()).parse(element.text)
+    return published, timestamps.display(published, element.text)
 
-    clean_text = html_text
-    for tag in ['<br>', '<br/>', '<br />', '</p>', '</div>', '</li>']:
-        clean_text = clean_text.replace(tag, ' ')
+def extract_summary(html_text, max_length=150):
+    """Extract plain text summary from HTML"""
+    import text_extract
 
-    clean_text = re.sub(r'<[^>]{1,100}>', '', clean_text)
-    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+    with metrics.timer('blog.summarize'):
+        return text_extract.summarize_html(html_text, max_length)
 
-    if len(clean_text) > max_length:
-        clean_text = clean_text[:max_length].rsplit(' ', 1)[0] + '...'
-    return clean_text
+def format_post(post):
+    """Format one blog post as markdown"""
+    return f"📝 **[{post.title}]({post.link})** ({post.date})\n   {post.summary}\n\n"
 
 def format_blog_roll(posts):
     """Format blog posts as markdown"""
     if not posts:
         return "## Latest from My Blog\n\n_Unable to fetch blog posts at this time._\n"
 
-    markdown = "## Latest from My Blog\n\n"
-    for post in posts:
-        markdown += f"📝 **[{post['title']}]({post['link']})** ({post['date']})\n"
-        markdown += f"   {post['summary']}\n\n"
+    return ''.join(["## Latest from My Blog\n\n", *map(format_post, posts)])
 
-    return markdown
+def archive_posts(posts):
+    """Add posts to the feed archive and rewrite the archive pages (when enabled)"""
+    try:
+        archive = feed_archive.open_archive()
+        if archive is None:
+            return
+        with metrics.timer('blog.archive'), archive:
+            added = archive.add(RSS_URL, posts)
+            print(f"Archived {added} new posts ({archive.count(RSS_URL)} in total)")
+            if feed_archive.PAGES_DIR:
+                feed_archive.write_pages(archive, RSS_URL, records.Post, 'blog', 'Blog archive', format_post)
+    except Exception as e:
+        print(f"Warning: could not update the feed archive: {e}")
 
-def update_readme(blog_content):
-    """Update README.md with blog roll content"""
+def render_from_archive():
+    """Render the section from the feed archive, or return None when it is disabled or empty"""
     try:
-        with open(README_PATH, 'r', encoding='utf-8') as f:
-            readme_content = f.read()
+        archive = feed_archive.open_archive()
+        if archive is None:
+            return None
+        with archive:
+            posts = archive.latest(RSS_URL, records.Post, NUM_POSTS)
+    except Exception as e:
+        print(f"Warning: could not read the feed archive: {e}")
+        return None
 
-        start_marker = "<!-- BLOG-POSTS-START -->"
-        end_marker = "<!-- BLOG-POSTS-END -->"
+    if not posts:
+        return None
 
-        if start_marker not in readme_content:
-            readme_content = readme_content.rstrip()
-            if not readme_content.endswith('\n'):
-                readme_content += '\n'
-            readme_content += f"\n{start_marker}\n{blog_content}{end_marker}\n"
-        else:
-            pattern = re.escape(start_marker) + r'.*?' + re.escape(end_marker)
-            readme_content = re.sub(pattern, f"{start_marker}\n{blog_content}{end_marker}",
-                                   readme_content, flags=re.DOTALL)
+    print(f"Rendering {len(posts)} posts from the feed archive")
+    return format_blog_roll(posts)
 
-        with open(README_PATH, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+def fallback_section():
+    """Render the section without the feed: from the archive, else the last good section"""
+    return readme_sections.fallback(SECTION, 'blog', RENDER_SOURCES, render_from_archive())
 
-        print("README.md updated successfully")
-        return True
-    except Exception as e:
-        print(f"Error updating README: {e}")
-        return False
+def update_readme(blog_content):
+    """Update README.md with blog roll content"""
+    return readme_sections.update_readme(README_PATH, {SECTION: blog_content})
 
-def main():
-    """Main function"""
+def build_section():
+    """Fetch the feed and render the blog section
+
+    Returns (content, digest). content is None when the feed could not be
+    fetched or parsed and fingerprint.UNCHANGED when it matches the last run.
+    """
     print("Fetching RSS feed...")
-    rss_content = fetch_rss_feed(RSS_URL)
+    with metrics.timer('blog.fetch'):
+        feed = feed_stream.open_feed(RSS_URL)
 
-    if not rss_content:
+    if feed is None:
         print("Failed to fetch RSS feed")
-        return False
-
-    print(f"Parsing {NUM_POSTS} most recent posts...")
-    posts = parse_rss_feed(rss_content)
+        return fallback_section()
+
+    digest = None
+    if isinstance(feed, bytes):
+        # Reused from the HTTP cache, so the fingerprint can be checked before parsing
+        digest = fingerprint.compute(feed, *RENDER_SOURCES)
+        if fingerprint.is_unchanged(SECTION, digest):
+            print("Feed unchanged since last run, skipping README update")
+            return fingerprint.UNCHANGED, digest
+
+    # The archive keeps every post: the first run parses the whole feed, later
+    # runs only the posts down to the newest one already archived. Older posts
+    # edited upstream are therefore not refreshed in the archive.
+    try:
+        archive = feed_archive.open_archive()
+    except Exception as e:
+        print(f"Warning: could not open the feed archive: {e}")
+        archive = None
+    try:
+        if archive is not None and not archive.count(RSS_URL):
+            max_posts, archived = None, None
+            print("Parsing all posts to fill the feed archive...")
+        else:
+            max_posts = NUM_POSTS
+            archived = (lambda post: archive.contains(RSS_URL, post)) if archive is not None else None
+            print(f"Parsing {NUM_POSTS} most recent posts...")
+        with metrics.timer('blog.parse'):
+            posts, content = feed_stream.read_feed(feed, lambda chunks: parse_rss_feed(chunks, max_posts, archived),
+                                                   RSS_URL, http_cache.get_cache())
+    finally:
+        if archive is not None:
+            archive.close()
 
     if not posts:
         print("No posts found in RSS feed")
-        return False
+        return fallback_section()
+
+    if archive is not None:
+        archive_posts(posts)
+        posts = posts[:NUM_POSTS]
+
+    if digest is None:
+        digest = fingerprint.compute(content, *RENDER_SOURCES)
+        if fingerprint.is_unchanged(SECTION, digest):
+            print("Feed unchanged since last run, skipping README update")
+            return fingerprint.UNCHANGED, digest
 
     print(f"Found {len(posts)} posts")
-    blog_content = format_blog_roll(posts)
+    with metrics.timer('blog.format'):
+        section = format_blog_roll(posts)
+    readme_sections.save_section(SECTION, section)
+    return section, digest
+
+def main():
+    """Main function"""
+    blog_content, digest = build_section()
+
+    if blog_content is None or blog_content is fingerprint.UNCHANGED:
+        return blog_content or False
 
     print("Updating README.md...")
     success = update_readme(blog_content)
 
     if success:
+        fingerprint.record(SECTION, digest)
         print("Blog roll update completed successfully!")
 
     return success
 
 if __name__ == "__main__":
-    main()
+    result = main()
+    metrics.write()
+    sys.exit(fingerprint.exit_code(result))
@@ -1,251 +1,754 @@
 #!/usr/bin/env python3
 
+import heapq
 import json
-import urllib.request
-import urllib.error
-import re
+import urllib.parse
 import os
+import re
+import sys
+import time
+
+import contribution_index
+import deadline
+import fingerprint
+import http_cache
+import metrics
+import rate_limit
+import readme_sections
+import records
 
 GITHUB_USERNAME = "harikrishnan83"
 README_PATH = "README.md"
+SECTION = "CONTRIBUTIONS"
+RENDER_SOURCES = fingerprint.sources(__file__, 'records')
+# The contributions section goes before the footer when the README has no markers yet
+README_ANCHOR = "\n---\n\n**Learn more by visiting my website"
 NUM_REPOS = 5
 GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN', '')
-
-def make_github_request(url, retry_count=0, max_retries=3):
-    """Make authenticated GitHub API request"""
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+# Number of repository detail requests allowed in flight at once (1 = sequential)
+DETAIL_WORKERS = int(os.environ.get('DETAIL_WORKERS', '8'))
+# Event pages are fetched EVENTS_PER_PAGE at a time, at most MAX_EVENT_PAGES pages
+EVENTS_PER_PAGE = 100
+MAX_EVENT_PAGES = 10
+# Stop discovery once this many distinct repositories are known (0 = no limit)
+MAX_DISCOVERED_REPOS = int(os.environ.get('MAX_DISCOVERED_REPOS', '0'))
+CONTRIBUTION_EVENT_TYPES = {'PushEvent', 'PullRequestEvent', 'IssuesEvent', 'IssueCommentEvent', 'PullRequestReviewEvent'}
+LINK_PATTERN = re.compile(r'<([^>]+)>\s*;\s*rel="([^"]+)"')
+# Repositories discovered by earlier runs are kept here (empty = rediscover from scratch)
+CONTRIBUTION_INDEX_PATH = os.environ.get('CONTRIBUTION_INDEX', os.path.join('.cache', 'contributions-index.json'))
+# Cached repository details older than this are fetched again
+DETAILS_MAX_AGE_DAYS = float(os.environ.get('DETAILS_MAX_AGE_DAYS', '7'))
+# 'rest' (default) or 'graphql'; the GraphQL backend requires GITHUB_TOKEN
+CONTRIBUTIONS_BACKEND = os.environ.get('CONTRIBUTIONS_BACKEND', 'rest').lower()
+GITHUB_GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', f'{GITHUB_API_URL}/graphql')
+# Larger API responses are refused instead of being read into memory
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+# Number of repositories looked up per aliased GraphQL query
+GRAPHQL_BATCH_SIZE = int(os.environ.get('GRAPHQL_BATCH_SIZE', '50'))
+# 'top-k' (default) fetches REST details only for repositories that can still make the top NUM_REPOS; 'all' fetches every one
+DETAIL_SELECTION = os.environ.get('DETAIL_SELECTION', 'top-k').lower()
+# Star counts cached in the index are assumed to have grown by at most this fraction since (0.1 = 10%)
+STAR_ESTIMATE_MARGIN = float(os.environ.get('STAR_ESTIMATE_MARGIN', '0.1'))
+# Returned by github_request for a repository the API answers 404 or 410 for
+NOT_FOUND = object()
+
+def decode_json(content):
+    """Decode a JSON response body straight from its bytes"""
+    with metrics.timer('contributions.decode'):
+        return json.loads(content)
+
+def github_request(url, retry_count=0, max_retries=3, payload=None, accept='application/vnd.github.v3+json',
+                   priority=rate_limit.PRIORITY_DISCOVERY, not_found=None):
+    """Make authenticated GitHub API request and return (data, response headers)
+
+    When payload is given it is sent as a JSON POST body (used for GraphQL).
+    GET requests are revalidated against the HTTP cache; 304 responses do not
+    count against the rate limit. Requests are paced by the rate-limit
+    scheduler in priority order, and rate-limited or failed requests are
+    retried after Retry-After or a jittered backoff, as long as the wait fits
+    in the run's deadline. data is None when the request failed, or
+    not_found when the API answered 404 or 410 (the resource is gone).
+    """
     headers = {
-        'Accept': 'application/vnd.github.v3+json',
+        'Accept': accept,
         'User-Agent': 'GitHub-Profile-Updater'
     }
     if GITHUB_TOKEN:
         headers['Authorization'] = f'token {GITHUB_TOKEN}'
 
+    data = None
+    cache = None
+    if payload is not None:
+        data = json.dumps(payload).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    else:
+        cache = http_cache.get_cache()
+
+    if cache:
+        cached = cache.get(url)
+        if cached is not None:
+            return decode_json(cached), cache.headers(url)
+        headers.update(cache.conditional_headers(url))
+
+    # Only a network request needs the HTTP and TLS stack
+    import urllib.error
+    import urllib.request
+    import http_client
+
+    scheduler = rate_limit.get_scheduler(url)
+
     try:
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as response:
+        if not scheduler.acquire(priority, timeout=deadline.remaining()):
+            print(f"Run deadline reached while waiting for the rate limit: {url}")
+            return None, {}
+        req = urllib.request.Request(url, data=data, headers=headers)
+        with http_client.urlopen(req, timeout=10, limit=MAX_RESPONSE_BYTES) as response:
+            scheduler.update(response.headers)
             rate_limit_remaining = response.headers.get('X-RateLimit-Remaining')
             if rate_limit_remaining and int(rate_limit_remaining) < 10:
                 print(f"Warning: Only {rate_limit_remaining} API requests remaining")
 
-            content = response.read(10 * 1024 * 1024)
-            return json.loads(content.decode('utf-8'))
+            content = response.read_body()
+            result = decode_json(content)
+            if cache:
+                cache.store(url, content, response.headers)
+            return result, response.headers
     except urllib.error.HTTPError as e:
+        scheduler.update(e.headers)
+        if e.code == 304 and cache:
+            cached = cache.revalidated(url)
+            if cached is not None:
+                return decode_json(cached), cache.headers(url)
         print(f"HTTP Error {e.code}: {e.reason} for URL: {url}")
-        if e.code == 403:
-            print("Rate limit exceeded. Check API rate limits.")
+        if e.code in (404, 410):
+            return not_found, {}
+        if e.code == 403 or e.code == 429:
             try:
-                rate_limit_reset = e.headers.get('X-RateLimit-Reset')
-                if rate_limit_reset:
-                    import time
-                    reset_time = int(rate_limit_reset) - int(time.time())
-                    print(f"Rate limit resets in {reset_time} seconds")
+                body = e.read(64 * 1024).decode('utf-8', 'replace')
             except Exception:
-                pass
-        elif e.code == 502 or e.code == 503 or e.code == 504:
+                body = ''
+            wait_time = rate_limit.rate_limit_wait(e.code, e.headers, body)
+            if wait_time is None:
+                print("Access forbidden.")
+            elif not deadline.allows(wait_time):
+                print(f"Rate limited for {wait_time:.0f} seconds, longer than the run deadline allows")
+            elif retry_count < max_retries and wait_time <= rate_limit.MAX_RATE_LIMIT_WAIT:
+                print(f"Rate limited. Waiting {wait_time:.0f} seconds before retrying...")
+                scheduler.pause(wait_time)
+                metrics.increment('github.retries')
+                return github_request(url, retry_count + 1, max_retries, payload, accept, priority, not_found)
+            else:
+                print(f"Rate limit exceeded. Limit resets in {wait_time:.0f} seconds")
+        elif e.code in (500, 502, 503, 504):
             if retry_count < max_retries:
-                import time
-                wait_time = 2 ** retry_count
-                print(f"Server error. Retrying in {wait_time} seconds...")
+                wait_time = rate_limit.retry_after_seconds(e.headers)
+                if wait_time is None:
+                    import http_replay
+
+                    # Seeded when replaying, so a replayed run waits the same every time
+                    rng = http_replay.jitter_random(req.get_method(), url, data, retry_count)
+                    wait_time = rate_limit.backoff_delay(retry_count, rng=rng)
+                if not deadline.allows(wait_time):
+                    print("Server error. Not retrying, the run deadline is too close")
+                    return None, {}
+                print(f"Server error. Retrying in {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
-                return make_github_request(url, retry_count + 1, max_retries)
-        return None
+                metrics.add_time('github.backoff', wait_time)
+                metrics.increment('github.retries')
+                return github_request(url, retry_count + 1, max_retries, payload, accept, priority, not_found)
+        return None, {}
     except urllib.error.URLError as e:
         print(f"URL Error for {url}: {e.reason}")
-        return None
+        return None, {}
+    except http_client.ResponseTooLarge as e:
+        print(f"Response too large: {e}")
+        return None, {}
     except json.JSONDecodeError as e:
         print(f"JSON decode error for {url}: {e}")
-        return None
+        return None, {}
     except Exception as e:
         print(f"Error making request to {url}: {e}")
+        return None, {}
+
+def make_github_request(url, retry_count=0, max_retries=3, payload=None, priority=rate_limit.PRIORITY_DISCOVERY,
+                        not_found=None):
+    """Make authenticated GitHub API request"""
+    return github_request(url, retry_count, max_retries, payload, priority=priority, not_found=not_found)[0]
+
+def parse_link_header(link_header):
+    """Parse an RFC 8288 Link header into a {rel: url} dict"""
+    links = {}
+    for part in (link_header or '').split(','):
+        match = LINK_PATTERN.search(part)
+        if match:
+            links[match.group(2)] = match.group(1)
+    return links
+
+def last_page_number(link_header):
+    """Return the page number of the rel="last" link, or None"""
+    last_url = parse_link_header(link_header).get('last')
+    if not last_url:
+        return None
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(last_url).query)
+    try:
+        return int(query['page'][0])
+    except (KeyError, ValueError):
         return None
 
-def fetch_contributed_repos():
-    """Fetch all public repositories the user has contributed to"""
-    print(f"Fetching contribution data for {GITHUB_USERNAME}...")
+def fetch_event_pages(username, on_page, executor, max_pages=MAX_EVENT_PAGES):
+    """Walk a user's public events, calling on_page(events) in page order
 
-    contributed_repos = {}
-    page = 1
-    max_pages = 10
+    Page 1 is fetched first; its Link header tells how many pages there are,
+    and the remaining ones are then fetched concurrently on executor. When
+    on_page returns True the pages not yet consumed are cancelled. Without a
+    Link header the pages are walked one by one until an empty page.
+    Returns False when a page that was needed could not be fetched.
+    """
+    def events_url(page):
+        return f"{GITHUB_API_URL}/users/{username}/events/public?page={page}&per_page={EVENTS_PER_PAGE}"
 
-    while page <= max_pages:
-        events_url = f"https://api.github.com/users/{GITHUB_USERNAME}/events/public?page={page}&per_page=100"
-        events = make_github_request(events_url)
+    events, headers = github_request(events_url(1))
+    if events is None:
+        return False
+    if not events or on_page(events):
+        return True
 
-        if not events or len(events) == 0:
-            break
+    last_page = last_page_number(headers.get('Link'))
+    if last_page is None:
+        for page in range(2, max_pages + 1):
+            if len(events) < EVENTS_PER_PAGE:
+                return True
+            events = make_github_request(events_url(page))
+            if events is None:
+                return False
+            if not events or on_page(events):
+                return True
+        return True
 
+    futures = [executor.submit(make_github_request, events_url(page))
+               for page in range(2, min(last_page, max_pages) + 1)]
+    try:
+        for future in futures:
+            events = future.result()
+            if events is None:
+                return False
+            if not events or on_page(events):
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+    return True
+
+def fetch_commit_search_repos(username):
+    """Return repositories from the commit search API (optional source)"""
+    search_url = f"{GITHUB_API_URL}/search/commits?q=author:{username}+is:public&sort=committer-date&order=desc&per_page=100"
+    search_results, _ = github_request(search_url, accept='application/vnd.github.cloak-preview+json')
+
+    if search_results is None:
+        print("Could not search commits (this is optional)")
+        return []
+
+    commits = search_results.get('items', [])
+    print(f"Found {len(commits)} commits from commit search")
+    return [commit.get('repository', {}).get('full_name', '') for commit in commits]
+
+def discover_contributions(max_repos=None, since_event_id=None, username=None):
+    """Discover the repositories username (default GITHUB_USERNAME) has contributed to
+
+    Event pages and the commit search run concurrently. Event paging stops
+    early once max_repos distinct repositories are known or an event at or
+    before since_event_id (the last run's cursor) is reached.
+
+    Returns ({repo_name: newest event ID or None}, newest event ID seen). The
+    event ID is None when an event page failed, so the cursor is not moved
+    past events that were never read.
+    """
+    username = username or GITHUB_USERNAME
+    print(f"Fetching contribution data for {username}...")
+
+    if max_repos is None:
+        max_repos = MAX_DISCOVERED_REPOS
+    contributed_repos = {}
+    newest_event_id = None
+
+    def collect(events):
+        nonlocal newest_event_id
         for event in events:
-            if event.get('type') in ['PushEvent', 'PullRequestEvent', 'IssuesEvent', 'IssueCommentEvent', 'PullRequestReviewEvent']:
+            event_id = event.get('id')
+            if since_event_id and int(event_id or 0) <= int(since_event_id):
+                return True
+            if newest_event_id is None:
+                newest_event_id = event_id
+
+            if event.get('type') in CONTRIBUTION_EVENT_TYPES:
                 repo = event.get('repo', {})
                 repo_name = repo.get('name', '')
 
                 if repo_name and repo_name not in contributed_repos:
-                    contributed_repos[repo_name] = True
+                    contributed_repos[repo_name] = event_id
 
-        page += 1
+            if max_repos and len(contributed_repos) >= max_repos:
+                return True
+        return False
 
-    print(f"Found {len(contributed_repos)} repositories from recent events")
+    from concurrent.futures import ThreadPoolExecutor
 
-    search_url = f"https://api.github.com/search/commits?q=author:{GITHUB_USERNAME}+is:public&sort=committer-date&order=desc&per_page=100"
-    headers = {
-        'Accept': 'application/vnd.github.cloak-preview+json',
-        'User-Agent': 'GitHub-Profile-Updater'
+    with ThreadPoolExecutor(max_workers=max(2, DETAIL_WORKERS)) as executor:
+        search_future = executor.submit(fetch_commit_search_repos, username)
+        complete = fetch_event_pages(username, collect, executor)
+        print(f"Found {len(contributed_repos)} repositories from recent events")
+        if not complete:
+            print("Warning: some event pages could not be fetched, keeping the previous cursor")
+            newest_event_id = None
+
+        for repo_name in search_future.result():
+            if repo_name and repo_name not in contributed_repos:
+                contributed_repos[repo_name] = None
+
+    print(f"Total unique repos: {len(contributed_repos)}")
+    if max_repos:
+        contributed_repos = dict(list(contributed_repos.items())[:max_repos])
+    return contributed_repos, newest_event_id
+
+def fetch_contributed_repos(max_repos=None, since_event_id=None, username=None):
+    """Fetch all public repositories the user has contributed to"""
+    contributed_repos, _ = discover_contributions(max_repos, since_event_id, username)
+    return list(contributed_repos.keys())
+
+def fetch_repo_detail(repo_name, gone=None):
+    """Fetch a single repository's details as a RepoInfo
+
+    A repository that no longer exists or is private is added to the set gone.
+    """
+    print(f"Fetching details for {repo_name}...")
+    repo_url = f"{GITHUB_API_URL}/repos/{repo_name}"
+    repo_data = make_github_request(repo_url, priority=rate_limit.PRIORITY_DETAIL, not_found=NOT_FOUND)
+
+    if repo_data is NOT_FOUND or (repo_data and repo_data.get('private', False)):
+        if gone is not None:
+            gone.add(repo_name)
+        return None
+    if not repo_data:
+        return None
+
+    return records.RepoInfo(
+        name=repo_data.get('name', ''),
+        full_name=repo_data.get('full_name', ''),
+        description=repo_data.get('description', records.NO_DESCRIPTION),
+        html_url=repo_data.get('html_url', ''),
+        stars=repo_data.get('stargazers_count', 0),
+        forks=repo_data.get('forks_count', 0),
+        language=repo_data.get('language', 'Unknown'),
+        is_fork=repo_data.get('fork', False)
+    )
+
+def fetch_repo_details(repo_names, max_workers=None, gone=None):
+    """Fetch detailed information for each repository
+
+    Requests run on a bounded thread pool; results keep the order of repo_names.
+    Repositories that no longer exist or are private are added to the set gone.
+    """
+    if max_workers is None:
+        max_workers = DETAIL_WORKERS
+    max_workers = max(1, min(max_workers, len(repo_names)))
+
+    if max_workers == 1:
+        results = [fetch_repo_detail(repo_name, gone) for repo_name in repo_names]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda repo_name: fetch_repo_detail(repo_name, gone), repo_names))
+
+    return [repo for repo in results if repo]
+
+GRAPHQL_CONTRIBUTED_QUERY = """
+query($login: String!, $cursor: String) {
+  user(login: $login) {
+    repositoriesContributedTo(
+      first: 100, after: $cursor, includeUserRepositories: true,
+      contributionTypes: [COMMIT, PULL_REQUEST, ISSUE, PULL_REQUEST_REVIEW]
+    ) {
+      nodes { nameWithOwner }
+      pageInfo { hasNextPage endCursor }
     }
-    if GITHUB_TOKEN:
-        headers['Authorization'] = f'token {GITHUB_TOKEN}'
+  }
+}
+"""
+
+GRAPHQL_REPO_FIELDS = """
+fragment RepoFields on Repository {
+  name
+  nameWithOwner
+  description
+  url
+  stargazerCount
+  forkCount
+  isFork
+  isPrivate
+  primaryLanguage { name }
+}
+"""
+
+GRAPHQL_STAR_FIELDS = """
+fragment RepoFields on Repository {
+  stargazerCount
+  isPrivate
+}
+"""
+
+def make_graphql_request(query, variables, priority=rate_limit.PRIORITY_DISCOVERY):
+    """Run a GraphQL query and return its data, printing any reported errors"""
+    result = make_github_request(GITHUB_GRAPHQL_URL, payload={'query': query, 'variables': variables},
+                                 priority=priority)
+    if not result:
+        return None
 
-    try:
-        req = urllib.request.Request(search_url, headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            search_results = json.loads(response.read().decode('utf-8'))
-            commits = search_results.get('items', [])
+    for error in result.get('errors') or []:
+        print(f"GraphQL error: {error.get('message', error)}")
 
-            for commit in commits:
-                repo_url = commit.get('repository', {}).get('full_name', '')
-                if repo_url and repo_url not in contributed_repos:
-                    contributed_repos[repo_url] = True
+    return result.get('data')
 
-            print(f"Found {len(commits)} commits, total unique repos: {len(contributed_repos)}")
-    except Exception as e:
-        print(f"Could not search commits (this is optional): {e}")
+def fetch_contributed_repos_graphql(username=None):
+    """Fetch contributed repositories through the GraphQL API"""
+    username = username or GITHUB_USERNAME
+    print(f"Fetching contribution data for {username} via GraphQL...")
 
-    return list(contributed_repos.keys())
+    repo_names = []
+    cursor = None
+    max_pages = 10
+
+    for _ in range(max_pages):
+        data = make_graphql_request(GRAPHQL_CONTRIBUTED_QUERY, {'login': username, 'cursor': cursor})
+        user = (data or {}).get('user') or {}
+        contributed = user.get('repositoriesContributedTo') or {}
+
+        for node in contributed.get('nodes') or []:
+            if node and node.get('nameWithOwner'):
+                repo_names.append(node['nameWithOwner'])
+
+        page_info = contributed.get('pageInfo') or {}
+        if not page_info.get('hasNextPage'):
+            break
+        cursor = page_info.get('endCursor')
+
+    print(f"Found {len(repo_names)} repositories via GraphQL")
+    return repo_names
+
+def build_repo_batch_query(repo_names, fragment=GRAPHQL_REPO_FIELDS):
+    """Build one aliased query (r0, r1, ...) looking up fragment's RepoFields for every repo in the batch"""
+    params = []
+    fields = []
+    variables = {}
+
+    for i, repo_name in enumerate(repo_names):
+        owner, _, name = repo_name.partition('/')
+        params.append(f"$o{i}: String!, $n{i}: String!")
+        fields.append(f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepoFields }}")
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+
+    query = f"query({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}\n" + fragment
+    return query, variables
+
+def fetch_repo_batch_graphql(repo_names, gone=None):
+    """Fetch details for one batch of repositories in a single GraphQL request
+
+    When the batch succeeds, repositories it reports missing or private are
+    added to the set gone.
+    """
+    print(f"Fetching details for {len(repo_names)} repositories via GraphQL...")
+    query, variables = build_repo_batch_query(repo_names)
+    data = make_graphql_request(query, variables, priority=rate_limit.PRIORITY_DETAIL) or {}
+
+    repos = []
+    for i, repo_name in enumerate(repo_names):
+        repo_data = data.get(f"r{i}")
+        if not repo_data or repo_data.get('isPrivate', False):
+            if data and gone is not None:
+                gone.add(repo_name)
+            continue
+
+        language = repo_data.get('primaryLanguage') or {}
+        repos.append(records.RepoInfo(
+            name=repo_data.get('name', ''),
+            full_name=repo_data.get('nameWithOwner', ''),
+            description=repo_data.get('description', records.NO_DESCRIPTION),
+            html_url=repo_data.get('url', ''),
+            stars=repo_data.get('stargazerCount', 0),
+            forks=repo_data.get('forkCount', 0),
+            language=language.get('name'),
+            is_fork=repo_data.get('isFork', False)
+        ))
+
+    return repos
+
+def fetch_repo_details_graphql(repo_names, batch_size=None, max_workers=None, gone=None):
+    """Fetch repository details in batches of aliased GraphQL queries
+
+    Returns the same records as fetch_repo_details, in the order of repo_names,
+    and collects the same gone repositories.
+    """
+    if batch_size is None:
+        batch_size = GRAPHQL_BATCH_SIZE
+    if max_workers is None:
+        max_workers = DETAIL_WORKERS
+
+    batch_size = max(1, batch_size)
+    batches = [repo_names[i:i + batch_size] for i in range(0, len(repo_names), batch_size)]
+    max_workers = max(1, min(max_workers, len(batches)))
+
+    if max_workers == 1:
+        results = [fetch_repo_batch_graphql(batch, gone) for batch in batches]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda batch: fetch_repo_batch_graphql(batch, gone), batches))
+
+    return [repo for batch in results for repo in batch]
+
+def fetch_star_counts_graphql(repo_names, batch_size=None):
+    """Look up current star counts for repo_names with batched GraphQL queries
+
+    Returns {repo_name: stars}. Private or missing repositories map to None;
+    repositories in a batch that failed are left out.
+    """
+    batch_size = max(1, batch_size or GRAPHQL_BATCH_SIZE)
+    stars = {}
+
+    for start in range(0, len(repo_names), batch_size):
+        batch = repo_names[start:start + batch_size]
+        query, variables = build_repo_batch_query(batch, GRAPHQL_STAR_FIELDS)
+        data = make_graphql_request(query, variables)
+        if not data:
+            continue
+
+        for i, repo_name in enumerate(batch):
+            repo_data = data.get(f"r{i}")
+            if not repo_data or repo_data.get('isPrivate', False):
+                stars[repo_name] = None
+            else:
+                stars[repo_name] = repo_data.get('stargazerCount') or 0
+
+    return stars
 
-def fetch_repo_details(repo_names):
-    """Fetch detailed information for each repository"""
-    repos_with_details = []
-
-    for repo_name in repo_names:
-        print(f"Fetching details for {repo_name}...")
-        repo_url = f"https://api.github.com/repos/{repo_name}"
-        repo_data = make_github_request(repo_url)
-
-        if repo_data and not repo_data.get('private', False):
-            repos_with_details.append({
-                'name': repo_data.get('name', ''),
-                'full_name': repo_data.get('full_name', ''),
-                'description': repo_data.get('description', 'No description available'),
-                'html_url': repo_data.get('html_url', ''),
-                'stars': repo_data.get('stargazers_count', 0),
-                'forks': repo_data.get('forks_count', 0),
-                'language': repo_data.get('language', 'Unknown'),
-                'is_fork': repo_data.get('fork', False)
-            })
-
-    return repos_with_details
+def star_bounds(repo_names, index=None):
+    """Return {repo_name: the most stars the repository can have now}
+
+    With a token one batched GraphQL lookup gives exact counts (private
+    repositories get -inf). Otherwise the star counts cached in the index are
+    used, allowing for STAR_ESTIMATE_MARGIN growth. Repositories without a
+    known count are left out.
+    """
+    if GITHUB_TOKEN:
+        stars = fetch_star_counts_graphql(repo_names)
+        if stars:
+            return {repo_name: float('-inf') if count is None else count for repo_name, count in stars.items()}
+
+    cached = index.cached_stars() if index else {}
+    return {repo_name: cached[repo_name] * (1 + STAR_ESTIMATE_MARGIN)
+            for repo_name in repo_names if repo_name in cached}
+
+def select_top_repos(repo_names, bounds, k, fetch_details, known=()):
+    """Fetch details in star order until no remaining repository can make the top k
+
+    bounds maps repository names to the most stars they can have; names
+    without a bound are fetched first. known holds records that are already
+    up to date. Candidates are fetched a wave at a time while a min-heap keeps
+    the k largest star counts seen; once the heap is full, a candidate whose
+    bound is below its smallest entry (and everything after it) is skipped.
+    Returns the records fetched.
+    """
+    def bound(repo_name):
+        return bounds.get(repo_name, float('inf'))
+
+    candidates = sorted(repo_names, key=bound, reverse=True)
+    leaders = []
+
+    def admit(repo):
+        if len(leaders) < k:
+            heapq.heappush(leaders, repo.stars)
+        elif repo.stars > leaders[0]:
+            heapq.heapreplace(leaders, repo.stars)
+
+    for repo in known:
+        admit(repo)
+
+    fetched = []
+    position = 0
+    while position < len(candidates):
+        batch = []
+        while position < len(candidates):
+            repo_name = candidates[position]
+            if len(leaders) >= k and bound(repo_name) < leaders[0]:
+                position = len(candidates)
+                break
+            # Unbounded candidates fill a whole wave; bounded ones only what the heap still needs
+            wave = DETAIL_WORKERS if bound(repo_name) == float('inf') else min(DETAIL_WORKERS, k - len(leaders))
+            if batch and len(batch) >= wave:
+                break
+            batch.append(repo_name)
+            position += 1
+
+        for repo in fetch_details(batch) if batch else []:
+            admit(repo)
+            fetched.append(repo)
+
+    print(f"Fetched details for {len(fetched)} of {len(candidates)} candidates "
+          f"(skipped {len(candidates) - len(fetched)} that cannot make the top {k})")
+    metrics.increment('contributions.details_skipped', len(candidates) - len(fetched))
+    return fetched
 
 def format_contributions(repos):
     """Format repositories as markdown"""
     if not repos:
         return "## Open Source Contributions\n\n_Unable to fetch contributions at this time._\n"
 
-    sorted_repos = sorted(repos, key=lambda x: x.get('stars', 0), reverse=True)
-    top_repos = sorted_repos[:NUM_REPOS]
-
-    markdown = "## Open Source Contributions\n\n"
-    markdown += "Here are a few repos I have contributed to:\n\n"
+    top_repos = records.top_k(repos, NUM_REPOS)
 
+    parts = ["## Open Source Contributions\n\n", "Here are a few repos I have contributed to:\n\n"]
     for repo in top_repos:
-        full_name = repo.get('full_name', 'Unknown')
-        html_url = repo.get('html_url', '#')
-        stars = repo.get('stars', 0)
-        language = repo.get('language', 'Various')
-
-        if not html_url.startswith('https://github.com/'):
-            print(f"Warning: Skipping invalid URL: {html_url}")
+        if not repo.html_url.startswith('https://github.com/'):
+            print(f"Warning: Skipping invalid URL: {repo.html_url}")
             continue
 
-        stars_formatted = f"{stars:,}"
-        language = language if language else 'Various'
-
-        markdown += f"📦 **[{full_name}]({html_url})** "
-        markdown += f"(★ {stars_formatted} | {language})\n"
+        parts.append(f"📦 **[{repo.full_name}]({repo.html_url})** "
+                     f"(★ {repo.stars:,} | {repo.language or 'Various'})\n"
+                     f"   {repo.summary}\n\n")
 
-        description = repo.get('description', 'No description available')
-        if description:
-            description = description.replace('\n', ' ').replace('\r', ' ')
-            if len(description) > 120:
-                description = description[:120].rsplit(' ', 1)[0] + '...'
-        else:
-            description = 'No description available'
-
-        markdown += f"   {description}\n\n"
-
-    return markdown
+    return ''.join(parts)
 
 def update_readme(contributions_content):
     """Update README.md with contributions content"""
-    try:
-        with open(README_PATH, 'r', encoding='utf-8') as f:
-            readme_content = f.read()
-
-        start_marker = "<!-- CONTRIBUTIONS-START -->"
-        end_marker = "<!-- CONTRIBUTIONS-END -->"
-
-        if start_marker not in readme_content:
-            pattern = r'(\n---\n\n\*\*Learn more by visiting my website)'
-            if re.search(pattern, readme_content):
-                readme_content = re.sub(
-                    pattern,
-                    f"\n{start_marker}\n{contributions_content}{end_marker}\n\n---\n\n**Learn more by visiting my website",
-                    readme_content
-                )
-            else:
-                readme_content = readme_content.rstrip()
-                if not readme_content.endswith('\n'):
-                    readme_content += '\n'
-                readme_content += f"\n{start_marker}\n{contributions_content}{end_marker}\n"
-        else:
-            pattern = re.escape(start_marker) + r'.*?' + re.escape(end_marker)
-            readme_content = re.sub(
-                pattern,
-                f"{start_marker}\n{contributions_content}{end_marker}",
-                readme_content,
-                flags=re.DOTALL
-            )
-
-        with open(README_PATH, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
-
-        print("README.md updated successfully")
-        return True
-    except Exception as e:
-        print(f"Error updating README: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    return readme_sections.update_readme(
+        README_PATH,
+        {SECTION: contributions_content},
+        anchors={SECTION: README_ANCHOR}
+    )
+
+def collect_repos(username=None, index_path=None):
+    """Discover username's contributions and return their repository details
+
+    index_path defaults to CONTRIBUTION_INDEX_PATH; an empty path disables the
+    persistent index. Returns None when nothing could be fetched.
+    """
+    if index_path is None:
+        index_path = CONTRIBUTION_INDEX_PATH
+    use_graphql = CONTRIBUTIONS_BACKEND == 'graphql'
 
-def main():
-    """Main function"""
     if not GITHUB_TOKEN:
         print("Warning: GITHUB_TOKEN not set. API rate limits will be restrictive.")
+        if use_graphql:
+            print("Warning: GraphQL backend requires GITHUB_TOKEN, falling back to REST")
+            use_graphql = False
 
-    # Fetch contributed repositories
-    repo_names = fetch_contributed_repos()
+    index = contribution_index.ContributionIndex(index_path) if index_path else None
+    # Repositories the API says are deleted or private; their cached details are dropped
+    gone = set()
+    fetch = fetch_repo_details_graphql if use_graphql else fetch_repo_details
 
-    if not repo_names:
-        print("No contributed repositories found")
-        return False
+    def fetch_details(repo_names):
+        return fetch(repo_names, gone=gone)
+
+    # GraphQL already fetches every repository's details in a few batched requests
+    top_k_only = not use_graphql and DETAIL_SELECTION == 'top-k'
 
-    # Fetch detailed information
-    repos = fetch_repo_details(repo_names)
+    # Fetch contributed repositories
+    with metrics.timer('contributions.discover'):
+        if use_graphql:
+            discovered = dict.fromkeys(fetch_contributed_repos_graphql(username))
+            cursor = None
+        else:
+            discovered, cursor = discover_contributions(since_event_id=index.cursor if index else None,
+                                                        username=username)
+
+    if index is None:
+        if not discovered:
+            print("No contributed repositories found")
+            return None
+
+        # Fetch detailed information
+        with metrics.timer('contributions.details'):
+            if top_k_only:
+                repos = select_top_repos(list(discovered), star_bounds(list(discovered)), NUM_REPOS, fetch_details)
+            else:
+                repos = fetch_details(list(discovered))
+    else:
+        index.merge(discovered, cursor)
+        if not index.repos:
+            print("No contributed repositories found")
+            return None
+
+        # Only refresh details that are missing or older than DETAILS_MAX_AGE_DAYS
+        stale = index.stale(DETAILS_MAX_AGE_DAYS * 24 * 60 * 60)
+        print(f"{len(discovered)} repositories seen this run, {len(index.repos)} indexed, {len(stale)} need details")
+        with metrics.timer('contributions.details'):
+            if top_k_only and stale:
+                stale_set = set(stale)
+                known = index.details([repo_name for repo_name in index.repos if repo_name not in stale_set])
+                bounds = star_bounds(stale, index)
+                gone.update(repo_name for repo_name, bound in bounds.items() if bound == float('-inf'))
+                fetched = select_top_repos(stale, bounds, NUM_REPOS, fetch_details, known)
+            else:
+                fetched = fetch_details(stale) if stale else []
+            index.update_details(fetched)
+            if gone:
+                print(f"Dropping details of {len(gone)} deleted or private repositories")
+                index.clear_details(gone)
+        index.save()
+        repos = index.details()
 
     if not repos:
         print("Could not fetch repository details")
-        return False
+        return None
 
     print(f"Successfully fetched details for {len(repos)} repositories")
+    return repos
+
+def fallback_section():
+    """Return (content, digest) of the last good section, or (None, None) when there is none"""
+    return readme_sections.fallback(SECTION, 'contributions', RENDER_SOURCES)
+
+def build_section():
+    """Discover contributions and render the contributions section
+
+    Returns (content, digest). content is None when nothing could be fetched
+    and fingerprint.UNCHANGED when the repositories match the last run.
+    """
+    repos = collect_repos()
+    if repos is None:
+        return fallback_section()
+
+    digest = fingerprint.compute([repo.to_dict() for repo in sorted(repos, key=records.name_key)], *RENDER_SOURCES)
+    if fingerprint.is_unchanged(SECTION, digest):
+        print("Contributions unchanged since last run, skipping README update")
+        return fingerprint.UNCHANGED, digest
 
     # Format as markdown
-    contributions_content = format_contributions(repos)
+    with metrics.timer('contributions.format'):
+        section = format_contributions(repos)
+    readme_sections.save_section(SECTION, section)
+    return section, digest
+
+def main():
+    """Main function"""
+    contributions_content, digest = build_section()
+
+    if contributions_content is None or contributions_content is fingerprint.UNCHANGED:
+        return contributions_content or False
 
     # Update README
     success = update_readme(contributions_content)
 
     if success:
+        fingerprint.record(SECTION, digest)
         print("Contributions update completed successfully!")
 
     return success
 
 if __name__ == "__main__":
-    main()
+    result = main()
+    metrics.write()
+    sys.exit(fingerprint.exit_code(result))
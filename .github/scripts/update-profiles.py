@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Script to render a README for every profile listed in a config file in one run
+
+The config (PROFILES_CONFIG, default profiles.json) is a JSON document:
+
+    {
+      "profiles": [
+        {
+          "name": "harikrishnan83",
+          "output": "profiles/harikrishnan83.md",
+          "template": "README.md",
+          "rss_url": "https://blog.harikrishnan.io/blog/feed.xml",
+          "playlist_id": "PLPK-HeXEV3yB8Nghu1qFgPHd2XvaJhSR_",
+          "channel_name": "Intent Driven Dev",
+          "github_username": "harikrishnan83"
+        }
+      ]
+    }
+
+Only name and output are required; a profile gets the sections whose source
+it lists. playlist_ids and channel_ids lists may replace playlist_id, and the
+videos of all those feeds are merged by publish date. The output file is created from template (default README.md) on
+the first run, without the template's sections whose source the profile
+does not list, and has its sections replaced in place afterwards.
+
+Every feed and contribution lookup is fetched concurrently on a thread pool,
+with identical feeds and usernames fetched once. Feed parsing and rendering
+then run on a process pool, one profile per task. Feed sections go through
+the render cache, so a feed that did not change since it was last rendered
+is neither parsed nor formatted again.
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import feed_stream
+import metrics
+import readme_sections
+import render_cache
+from script_loader import load_script
+
+# Configuration
+PROFILES_CONFIG = os.environ.get('PROFILES_CONFIG', 'profiles.json')
+TEMPLATE_PATH = "README.md"
+# Feeds and contribution lookups in flight at once
+FETCH_WORKERS = int(os.environ.get('PROFILE_FETCH_WORKERS', '8'))
+# Processes parsing and rendering profiles (1 = render in this process)
+RENDER_WORKERS = int(os.environ.get('PROFILE_RENDER_WORKERS', str(os.cpu_count() or 1)))
+
+def load_profiles(path):
+    """Read the profile list from the config file, skipping incomplete entries"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading profiles config {path}: {e}")
+        return None
+
+    profiles = []
+    for profile in config.get('profiles', []):
+        if not profile.get('name') or not profile.get('output'):
+            print(f"Warning: Skipping profile without name or output: {profile}")
+            continue
+        profiles.append(profile)
+    return profiles
+
+def contribution_index_path(username):
+    """Per-user contribution index next to the default one ('' when disabled)"""
+    contributions = load_script('update-contributions')
+    if not contributions.CONTRIBUTION_INDEX_PATH:
+        return ''
+    base, ext = os.path.splitext(contributions.CONTRIBUTION_INDEX_PATH)
+    return f"{base}-{username.lower()}{ext}"
+
+def video_feeds(profile):
+    """Return (playlist IDs, channel IDs) of the YouTube feeds a profile lists"""
+    playlist_ids = profile.get('playlist_ids') or ([profile['playlist_id']] if profile.get('playlist_id') else [])
+    return playlist_ids, profile.get('channel_ids') or []
+
+def fetch_sources(profiles, max_workers=None):
+    """Fetch every feed and contribution list the profiles need
+
+    Returns {(kind, key): result} where kind is 'feed' (keyed by URL, result
+    is the feed body) or 'repos' (keyed by username, result is the list of
+    RepoInfo records). Failed fetches map to None.
+    """
+    youtube = load_script('update-youtube-videos')
+    contributions = load_script('update-contributions')
+
+    jobs = {}
+    for profile in profiles:
+        if profile.get('rss_url'):
+            jobs[('feed', profile['rss_url'])] = (feed_stream.fetch_feed, profile['rss_url'])
+        for url in youtube.feed_urls(*video_feeds(profile)):
+            jobs[('feed', url)] = (feed_stream.fetch_feed, url)
+        if profile.get('github_username'):
+            username = profile['github_username']
+            jobs[('repos', username)] = (contributions.collect_repos, username,
+                                         contribution_index_path(username))
+
+    if not jobs:
+        return {}
+
+    if max_workers is None:
+        max_workers = FETCH_WORKERS
+    max_workers = max(1, min(max_workers, len(jobs)))
+
+    print(f"Fetching {len(jobs)} sources for {len(profiles)} profiles...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {key: executor.submit(*job) for key, job in jobs.items()}
+
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            print(f"Error fetching {key[1]}: {e}")
+            results[key] = None
+    return results
+
+def profile_sources(profile, results):
+    """Pick the fetched data one profile needs out of fetch_sources' results"""
+    youtube = load_script('update-youtube-videos')
+    sources = {}
+    if profile.get('rss_url'):
+        sources['blog'] = results.get(('feed', profile['rss_url']))
+    urls = youtube.feed_urls(*video_feeds(profile))
+    if urls:
+        sources['videos'] = [results.get(('feed', url)) for url in urls]
+    if profile.get('github_username'):
+        sources['repos'] = results.get(('repos', profile['github_username']))
+    return sources
+
+def render_blog(bodies):
+    """Blog section from the feed body, or None when it has no posts"""
+    blog = load_script('update-blog-posts')
+    posts = blog.parse_rss_feed(bodies[0])
+    return blog.format_blog_roll(posts) if posts else None
+
+def render_videos(bodies, url, channel_name):
+    """Videos section merged from the feed bodies, or None when they have no videos"""
+    youtube = load_script('update-youtube-videos')
+    videos = youtube.latest_videos([youtube.parse_youtube_feed(body, None) for body in bodies])
+    return youtube.format_video_list(videos, url, channel_name) if videos else None
+
+def render_sections(profile, sources, first_run):
+    """Parse and format every section of one profile
+
+    Feed sections go through the render cache keyed by the feed bodies, so
+    a feed that did not change is neither parsed nor formatted again. A
+    source that failed to fetch keeps its current section. On the first
+    run, where the template's section would belong to someone else, the
+    profile's last good section is used, or the failure placeholder when
+    there is none.
+    """
+    blog = load_script('update-blog-posts')
+    youtube = load_script('update-youtube-videos')
+    contributions = load_script('update-contributions')
+
+    sections = {}
+    anchors = {}
+
+    def add(section, content, placeholder):
+        cache_name = f"{profile['name']}-{section}"
+        if content is not None:
+            sections[section] = content
+            readme_sections.save_section(cache_name, content)
+        elif first_run:
+            sections[section] = readme_sections.load_section(cache_name) or placeholder()
+
+    if 'blog' in sources:
+        body = sources['blog']
+        add(blog.SECTION, render_cache.render(blog.SECTION, blog.RENDER_SOURCES + (__file__,), [body], render_blog)
+            if body else None,
+            lambda: blog.format_blog_roll([]))
+
+    if 'videos' in sources:
+        bodies = [body for body in sources['videos'] if body]
+        url = youtube.view_all_url(*video_feeds(profile))
+        channel_name = profile.get('channel_name') or youtube.CHANNEL_NAME
+        add(youtube.SECTION, render_cache.render(youtube.SECTION, youtube.RENDER_SOURCES + (__file__,), bodies,
+                                                 render_videos, url, channel_name) if bodies else None,
+            lambda: youtube.format_video_list([], url, channel_name))
+
+    if 'repos' in sources:
+        repos = sources['repos']
+        add(contributions.SECTION, contributions.format_contributions(repos) if repos else None,
+            lambda: contributions.format_contributions([]))
+        if contributions.SECTION in sections:
+            anchors[contributions.SECTION] = contributions.README_ANCHOR
+
+    return sections, anchors
+
+def unlisted_sections(sources):
+    """Names of the sections whose source is not among a profile's sources"""
+    blog = load_script('update-blog-posts')
+    youtube = load_script('update-youtube-videos')
+    contributions = load_script('update-contributions')
+    return [section for kind, section in (('blog', blog.SECTION), ('videos', youtube.SECTION),
+                                          ('repos', contributions.SECTION)) if kind not in sources]
+
+def render_profile(profile, sources):
+    """Render one profile's output file; runs in a worker process
+
+    Returns (profile name, 'updated' | 'unchanged' | 'failed', render cache
+    hits, render cache misses).
+    """
+    name = profile['name']
+    output = profile['output']
+    before = render_cache.stats()
+
+    def result(status):
+        after = render_cache.stats()
+        return name, status, after['hits'] - before['hits'], after['misses'] - before['misses']
+
+    try:
+        first_run = not os.path.exists(output)
+        with open(profile.get('template', TEMPLATE_PATH) if first_run else output, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if first_run:
+            # The template's other sections belong to whoever the template was written for
+            text = readme_sections.remove(text, unlisted_sections(sources))
+
+        sections, anchors = render_sections(profile, sources, first_run)
+        updated = readme_sections.render(text, sections, anchors)
+
+        if updated == text and not first_run:
+            return result('unchanged')
+
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        readme_sections.write_atomic(output, updated)
+        return result('updated')
+    except Exception as e:
+        print(f"Error rendering profile {name}: {e}")
+        return result('failed')
+
+def render_profiles(profiles, results, max_workers=None):
+    """Render every profile, in parallel worker processes when there are several"""
+    if max_workers is None:
+        max_workers = RENDER_WORKERS
+    max_workers = max(1, min(max_workers, len(profiles)))
+
+    tasks = [(profile, profile_sources(profile, results)) for profile in profiles]
+    if max_workers == 1:
+        return [render_profile(profile, sources) for profile, sources in tasks]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(render_profile, profile, sources) for profile, sources in tasks]
+        return [future.result() for future in futures]
+
+def main(config_path=None):
+    """Main function"""
+    profiles = load_profiles(config_path or PROFILES_CONFIG)
+    if not profiles:
+        print("No profiles to render")
+        return False
+
+    with metrics.timer('profiles.fetch'):
+        results = fetch_sources(profiles)
+
+    print(f"Rendering {len(profiles)} profiles...")
+    with metrics.timer('profiles.render'):
+        statuses = render_profiles(profiles, results)
+
+    for name, status, _, _ in statuses:
+        print(f"  {name:<24} {status}")
+    hits = sum(status[2] for status in statuses)
+    misses = sum(status[3] for status in statuses)
+    print(f"Render cache: {hits} hits, {misses} misses")
+
+    failed = [name for name, status, _, _ in statuses if status == 'failed']
+    if failed:
+        print(f"Failed to render {len(failed)} profiles: {', '.join(failed)}")
+        return False
+
+    print("Profile update completed successfully!")
+    return True
+
+if __name__ == "__main__":
+    result = main(sys.argv[1] if len(sys.argv) > 1 else None)
+    metrics.write()
+    sys.exit(0 if result else 1)
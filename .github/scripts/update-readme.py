@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script to refresh every README.md section (blog posts, YouTube videos and open
+source contributions) concurrently and write them with a single README update
+"""
+
+import asyncio
+import sys
+import time
+
+import fingerprint
+import metrics
+import readme_sections
+from script_loader import load_script
+
+# Configuration
+README_PATH = "README.md"
+SOURCES = [
+    'update-blog-posts',
+    'update-youtube-videos',
+    'update-contributions',
+]
+
+async def refresh_source(name):
+    """Build one source's section on a worker thread, timing it"""
+    module = load_script(name)
+    start = time.monotonic()
+    try:
+        content, digest = await asyncio.to_thread(module.build_section)
+    except Exception as e:
+        print(f"Error refreshing {name}: {e}")
+        content, digest = None, None
+    elapsed = time.monotonic() - start
+    metrics.add_time(f"source.{name}", elapsed)
+    return module, content, digest, elapsed
+
+async def refresh_all(sources):
+    """Refresh all sources concurrently"""
+    return await asyncio.gather(*(refresh_source(name) for name in sources))
+
+def print_timings(results, total):
+    """Print how long each source took next to the end-to-end time"""
+    print("\nSource timings:")
+    for module, content, _, elapsed in results:
+        if content is None:
+            status = 'failed'
+        elif content is fingerprint.UNCHANGED:
+            status = 'unchanged'
+        else:
+            status = 'updated'
+        print(f"  {module.SECTION:<16} {elapsed:7.2f}s  {status}")
+    print(f"  {'total':<16} {total:7.2f}s\n")
+
+def main():
+    """Main function"""
+    start = time.monotonic()
+    results = asyncio.run(refresh_all(SOURCES))
+    print_timings(results, time.monotonic() - start)
+
+    sections = {}
+    anchors = {}
+    for module, content, _, _ in results:
+        if content is None or content is fingerprint.UNCHANGED:
+            continue
+        sections[module.SECTION] = content
+        if getattr(module, 'README_ANCHOR', None):
+            anchors[module.SECTION] = module.README_ANCHOR
+
+    if not sections:
+        if all(content is fingerprint.UNCHANGED for _, content, _, _ in results):
+            return fingerprint.UNCHANGED
+        print("No sections could be refreshed")
+        return False
+
+    print(f"Updating README.md ({', '.join(sections)})...")
+    success = readme_sections.update_readme(README_PATH, sections, anchors)
+
+    if success:
+        for module, content, digest, _ in results:
+            if module.SECTION in sections:
+                fingerprint.record(module.SECTION, digest)
+        print("README update completed successfully!")
+
+    return success
+
+if __name__ == "__main__":
+    result = main()
+    metrics.write()
+    sys.exit(fingerprint.exit_code(result))
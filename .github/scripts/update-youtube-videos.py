@@ -1,17 +1,44 @@
 #!/usr/bin/env python3
 """
-Script to fetch YouTube videos from playlist RSS feed and update README.md
+Script to fetch YouTube videos from playlist and channel RSS feeds and update README.md
+
+Every feed listed in YOUTUBE_PLAYLIST_IDS and YOUTUBE_CHANNEL_IDS is fetched
+and parsed concurrently. The feeds are then merged by publish date into the
+latest NUM_VIDEOS videos, with a video that appears in several feeds shown
+once.
 """
 
-import xml.etree.ElementTree as ET
-import urllib.request
-import re
-from datetime import datetime
+import os
+import sys
+
+import feed_archive
+import feed_stream
+import fingerprint
+import http_cache
+import metrics
+import readme_sections
+import records
+import timestamps
 
 # Configuration
 PLAYLIST_ID = "PLPK-HeXEV3yB8Nghu1qFgPHd2XvaJhSR_"
-RSS_URL = f"https://www.youtube.com/feeds/videos.xml?playlist_id={PLAYLIST_ID}"
+CHANNEL_NAME = "Intent Driven Dev"
+FEED_URL = "https://www.youtube.com/feeds/videos.xml?playlist_id={playlist_id}"
+PLAYLIST_URL = "https://www.youtube.com/playlist?list={playlist_id}"
+CHANNEL_FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+CHANNEL_URL = "https://www.youtube.com/channel/{channel_id}/videos"
+RSS_URL = FEED_URL.format(playlist_id=PLAYLIST_ID)
+# Comma-separated playlist and channel IDs whose videos are merged
+PLAYLIST_IDS = [i.strip() for i in os.environ.get('YOUTUBE_PLAYLIST_IDS', PLAYLIST_ID).split(',') if i.strip()]
+CHANNEL_IDS = [i.strip() for i in os.environ.get('YOUTUBE_CHANNEL_IDS', '').split(',') if i.strip()]
+# Feeds fetched at once
+FEED_WORKERS = int(os.environ.get('YOUTUBE_FEED_WORKERS', '4'))
+# Every feed is archived under this one key, so a video in several playlists
+# is stored once; it is the original single feed, which keeps old archives valid
+ARCHIVE_FEED = RSS_URL
 README_PATH = "README.md"
+SECTION = "YOUTUBE-VIDEOS"
+RENDER_SOURCES = fingerprint.sources(__file__, 'feed_archive', 'feed_stream', 'records', 'text_extract', 'timestamps')
 NUM_VIDEOS = 5
 
 # XML namespaces
@@ -21,65 +48,111 @@ ns = {
     'yt': 'http://www.youtube.com/xml/schemas/2015'
 }
 
-def fetch_rss_feed(url):
-    """Fetch RSS feed from URL"""
+ATOM_ENTRY = f"{{{ns['atom']}}}entry"
+
+def feed_urls(playlist_ids=None, channel_ids=None):
+    """Feed URLs of the playlists and channels (default PLAYLIST_IDS and CHANNEL_IDS), each once"""
+    playlist_ids = PLAYLIST_IDS if playlist_ids is None else playlist_ids
+    channel_ids = CHANNEL_IDS if channel_ids is None else channel_ids
+    urls = [FEED_URL.format(playlist_id=playlist_id) for playlist_id in playlist_ids]
+    urls += [CHANNEL_FEED_URL.format(channel_id=channel_id) for channel_id in channel_ids]
+    return list(dict.fromkeys(urls))
+
+def map_feeds(fn, items, max_workers=None):
+    """Return [fn(*item) for item in items], run on a thread pool when there are several"""
+    items = list(items)
+    if max_workers is None:
+        max_workers = FEED_WORKERS
+    max_workers = max(1, min(max_workers, len(items)))
+
+    if max_workers == 1:
+        return [fn(*item) for item in items]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda item: fn(*item), items))
+
+def read_videos(url, feed):
+    """Stream-parse every video of an opened feed; return (videos, body) or None on failure"""
     try:
-        if not url.startswith(('http://', 'https://')):
-            print(f"Invalid URL scheme: {url}")
-            return None
-
-        req = urllib.request.Request(url)
-        req.add_header('User-Agent', 'Mozilla/5.0 (GitHub-Profile-Updater)')
-
-        with urllib.request.urlopen(req, timeout=10) as response:
-            content_type = response.headers.get('Content-Type', '')
-            if not any(ct in content_type.lower() for ct in ['xml', 'rss', 'atom', 'application/xml', 'text/xml']):
-                print(f"Warning: Unexpected content type: {content_type}")
-
-            content = response.read(5 * 1024 * 1024)
-            return content.decode('utf-8')
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error fetching RSS feed: {e.code} {e.reason}")
-        return None
-    except urllib.error.URLError as e:
-        print(f"URL Error fetching RSS feed: {e.reason}")
-        return None
+        return feed_stream.read_feed(feed, lambda chunks: parse_youtube_feed(chunks, None),
+                                     url, http_cache.get_cache())
     except Exception as e:
-        print(f"Error fetching RSS feed: {e}")
+        print(f"Error reading feed {url}: {e}")
         return None
 
-def parse_youtube_feed(rss_content):
-    """Parse YouTube Atom feed and extract video information"""
+def latest_videos(feeds, count=NUM_VIDEOS):
+    """Merge the video lists of several feeds into the newest count, each video once
+
+    A playlist feed lists videos in playlist order, so each list is sorted
+    newest first before the k-way merge.
+    """
+    streams = [sorted(videos, key=records.published_key, reverse=True) for videos in feeds]
+    return records.merge_latest(streams, count)
+
+def feeds_digest(contents):
+    """Fingerprint of the bodies of every feed; a single feed is fingerprinted as is"""
+    if len(contents) == 1:
+        return fingerprint.compute(next(iter(contents.values())), *RENDER_SOURCES)
+
+    # Several feeds: each body is prefixed with its URL and length, in feed order
+    data = bytearray()
+    for url, content in contents.items():
+        data += f"{url}\n{len(content)}\n".encode('utf-8')
+        data += content
+    return fingerprint.compute(data, *RENDER_SOURCES)
+
+def parse_youtube_entry(entry, dates=None):
+    """Extract a Video from an Atom <entry>; dates is the feed's timestamps.FeedDates"""
+    title = entry.find('atom:title', ns)
+    link = entry.find('atom:link', ns)
+    pub_date = entry.find('atom:published', ns)
+    media_group = entry.find('media:group', ns)
+    video_id = entry.find('yt:videoId', ns)
+
+    if title is None:
+        return None
+
+    link_href = ''
+    if link is not None and link.get('href'):
+        link_href = link.get('href')
+
+    description = ''
+    if media_group is not None:
+        media_desc = media_group.find('media:description', ns)
+        if media_desc is not None and media_desc.text:
+            description = media_desc.text
+
+    published, date = parse_date(pub_date, dates)
+    return records.Video(
+        title=title.text or '',
+        link=link_href,
+        date=date,
+        description=extract_description(description, 150),
+        published=published,
+        guid=(video_id.text or '') if video_id is not None else ''
+    )
+
+def parse_youtube_feed(rss_content, max_videos=NUM_VIDEOS):
+    """Parse YouTube Atom feed and extract video information
+
+    rss_content is the whole document or an iterable of byte chunks. Entries
+    are parsed as they stream in and parsing stops after max_videos videos
+    (None = every video).
+    """
     try:
-        root = ET.fromstring(rss_content)
         videos = []
+        chunks = feed_stream.iter_chunks(rss_content)
+        dates = timestamps.FeedDates()
+
+        for entry in feed_stream.iter_entries(chunks, {ATOM_ENTRY}):
+            video_data = parse_youtube_entry(entry, dates)
 
-        for entry in root.findall('atom:entry', ns):
-            title = entry.find('atom:title', ns)
-            link = entry.find('atom:link', ns)
-            pub_date = entry.find('atom:published', ns)
-            media_group = entry.find('media:group', ns)
-
-            if title is not None:
-                link_href = ''
-                if link is not None and link.get('href'):
-                    link_href = link.get('href')
-
-                description = ''
-                if media_group is not None:
-                    media_desc = media_group.find('media:description', ns)
-                    if media_desc is not None and media_desc.text:
-                        description = media_desc.text
-
-                video_data = {
-                    'title': title.text or '',
-                    'link': link_href,
-                    'date': parse_date(pub_date.text) if pub_date is not None else 'Unknown',
-                    'description': extract_description(description, 150)
-                }
+            if video_data:
                 videos.append(video_data)
 
-                if len(videos) >= NUM_VIDEOS:
+                if max_videos is not None and len(videos) >= max_videos:
                     break
 
         return videos
@@ -89,95 +162,168 @@ def parse_youtube_feed(rss_content):
         traceback.print_exc()
         return []
 
-def parse_date(date_string):
-    """Parse ISO date format and return formatted date"""
-    try:
-        date_obj = datetime.fromisoformat(date_string.replace('Z', '+00:00'))
-        return date_obj.strftime('%B %d, %Y')
-    except Exception:
-        return date_string
+def parse_date(element, dates=None):
+    """Return (published datetime or None, display date) for a date element"""
+    if element is None or not element.text:
+        return None, 'Unknown'
+
+    published = (dates or timestamps.FeedDates()).parse(element.text)
+    return published, timestamps.display(published, element.text)
 
 def extract_description(text, max_length=150):
     """Extract plain text description"""
-    if not text:
-        return ''
+    import text_extract
+
+    with metrics.timer('youtube.summarize'):
+        return text_extract.summarize_text(text, max_length)
+
+def format_video(video):
+    """Format one video as markdown"""
+    markdown = f"📺 **[{video.title}]({video.link})** ({video.date})\n"
+    if video.description:
+        markdown += f"   {video.description}\n"
+    return markdown + "\n"
+
+def view_all_url(playlist_ids=None, channel_ids=None):
+    """Link for "View all videos": the first playlist, else the first channel"""
+    playlist_ids = PLAYLIST_IDS if playlist_ids is None else playlist_ids
+    channel_ids = CHANNEL_IDS if channel_ids is None else channel_ids
+    if playlist_ids:
+        return PLAYLIST_URL.format(playlist_id=playlist_ids[0])
+    if channel_ids:
+        return CHANNEL_URL.format(channel_id=channel_ids[0])
+    return PLAYLIST_URL.format(playlist_id=PLAYLIST_ID)
+
+def format_video_list(videos, url=None, channel_name=None):
+    """Format videos as markdown, linking to url (default view_all_url())"""
+    playlist_url = url or view_all_url()
+    heading = f"## Latest Videos from {channel_name or CHANNEL_NAME}\n\n"
+    if not videos:
+        return f"{heading}_Unable to fetch videos at this time._\n\n[View all videos]({playlist_url})\n"
 
-    text = text[:10000]
-    clean_text = re.sub(r'\s+', ' ', text).strip()
+    return ''.join([heading, *map(format_video, videos), f"[View all videos]({playlist_url})\n"])
 
-    if len(clean_text) > max_length:
-        clean_text = clean_text[:max_length].rsplit(' ', 1)[0] + '...'
-    return clean_text
+def archive_videos(videos):
+    """Add videos to the feed archive and rewrite the archive pages (when enabled)"""
+    try:
+        archive = feed_archive.open_archive()
+        if archive is None:
+            return
+        with metrics.timer('youtube.archive'), archive:
+            added = archive.add(ARCHIVE_FEED, videos)
+            print(f"Archived {added} new videos ({archive.count(ARCHIVE_FEED)} in total)")
+            if feed_archive.PAGES_DIR:
+                feed_archive.write_pages(archive, ARCHIVE_FEED, records.Video, 'videos',
+                                         f"Videos from {CHANNEL_NAME}", format_video)
+    except Exception as e:
+        print(f"Warning: could not update the feed archive: {e}")
 
-def format_video_list(videos):
-    """Format videos as markdown"""
+def archived_videos():
+    """The latest NUM_VIDEOS archived videos, or [] when the archive is disabled or unreadable"""
+    try:
+        archive = feed_archive.open_archive()
+        if archive is None:
+            return []
+        with archive:
+            return archive.latest(ARCHIVE_FEED, records.Video, NUM_VIDEOS)
+    except Exception as e:
+        print(f"Warning: could not read the feed archive: {e}")
+        return []
+
+def render_from_archive():
+    """Render the section from the feed archive, or return None when it is disabled or empty"""
+    videos = archived_videos()
     if not videos:
-        return "## Latest Videos from Intent Driven Dev\n\n_Unable to fetch videos at this time._\n\n[View all videos](https://www.youtube.com/playlist?list=PLPK-HeXEV3yB8Nghu1qFgPHd2XvaJhSR_)\n"
+        return None
 
-    markdown = "## Latest Videos from Intent Driven Dev\n\n"
-    for video in videos:
-        markdown += f"📺 **[{video['title']}]({video['link']})** ({video['date']})\n"
-        if video['description']:
-            markdown += f"   {video['description']}\n"
-        markdown += "\n"
+    print(f"Rendering {len(videos)} videos from the feed archive")
+    return format_video_list(videos)
 
-    markdown += "[View all videos](https://www.youtube.com/playlist?list=PLPK-HeXEV3yB8Nghu1qFgPHd2XvaJhSR_)\n"
-    return markdown
+def fallback_section():
+    """Render the section without the feed: from the archive, else the last good section"""
+    return readme_sections.fallback(SECTION, 'youtube', RENDER_SOURCES, render_from_archive())
 
 def update_readme(video_content):
     """Update README.md with video content"""
-    try:
-        with open(README_PATH, 'r', encoding='utf-8') as f:
-            readme_content = f.read()
-
-        start_marker = "<!-- YOUTUBE-VIDEOS-START -->"
-        end_marker = "<!-- YOUTUBE-VIDEOS-END -->"
-
-        if start_marker not in readme_content:
-            readme_content = readme_content.rstrip()
-            if not readme_content.endswith('\n'):
-                readme_content += '\n'
-            readme_content += f"\n{start_marker}\n{video_content}{end_marker}\n"
-        else:
-            pattern = re.escape(start_marker) + r'.*?' + re.escape(end_marker)
-            readme_content = re.sub(pattern, f"{start_marker}\n{video_content}{end_marker}",
-                                   readme_content, flags=re.DOTALL)
-
-        with open(README_PATH, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
-
-        print("README.md updated successfully")
-        return True
-    except Exception as e:
-        print(f"Error updating README: {e}")
-        return False
-
-def main():
-    """Main function"""
-    print("Fetching YouTube RSS feed...")
-    rss_content = fetch_rss_feed(RSS_URL)
-
-    if not rss_content:
+    return readme_sections.update_readme(README_PATH, {SECTION: video_content})
+
+def build_section():
+    """Fetch every feed and render the videos section
+
+    Returns (content, digest). content is None when no feed could be fetched
+    or parsed and fingerprint.UNCHANGED when the feeds match the last run. A
+    feed that fails is left out; its videos still come from the archive when
+    it is enabled.
+    """
+    urls = feed_urls()
+    print(f"Fetching {len(urls)} YouTube RSS feeds...")
+    with metrics.timer('youtube.fetch'):
+        feeds = dict(zip(urls, map_feeds(feed_stream.open_feed, [(url,) for url in urls])))
+
+    opened = {url: feed for url, feed in feeds.items() if feed is not None}
+    if not opened:
         print("Failed to fetch RSS feed")
-        return False
+        return fallback_section()
+
+    digest = None
+    if len(opened) == len(urls) and all(isinstance(feed, bytes) for feed in opened.values()):
+        # Every feed reused from the HTTP cache, so the fingerprint can be checked before parsing
+        digest = feeds_digest(opened)
+        if fingerprint.is_unchanged(SECTION, digest):
+            print("Feeds unchanged since last run, skipping README update")
+            return fingerprint.UNCHANGED, digest
+
+    print(f"Parsing {len(opened)} feeds...")
+    with metrics.timer('youtube.parse'):
+        parsed = dict(zip(opened, map_feeds(read_videos, opened.items())))
+
+    contents = {url: result[1] for url, result in parsed.items() if result is not None}
+    feed_videos = [result[0] for result in parsed.values() if result is not None]
+    failed = [url for url in urls if url not in contents]
+    for url in failed:
+        print(f"Warning: leaving out feed {url}")
+
+    if not any(feed_videos):
+        print("No videos found in RSS feed")
+        return fallback_section()
 
-    print(f"Parsing {NUM_VIDEOS} most recent videos...")
-    videos = parse_youtube_feed(rss_content)
+    if feed_archive.ARCHIVE_PATH:
+        archive_videos([video for videos in feed_videos for video in videos])
+        if failed:
+            feed_videos.append(archived_videos())
 
-    if not videos:
-        print("No videos found in RSS feed")
-        return False
+    videos = latest_videos(feed_videos)
+    metrics.gauge('youtube.feeds', len(contents))
+
+    if digest is None:
+        digest = feeds_digest(contents)
+        if fingerprint.is_unchanged(SECTION, digest):
+            print("Feeds unchanged since last run, skipping README update")
+            return fingerprint.UNCHANGED, digest
 
     print(f"Found {len(videos)} videos")
-    video_content = format_video_list(videos)
+    with metrics.timer('youtube.format'):
+        section = format_video_list(videos)
+    readme_sections.save_section(SECTION, section)
+    return section, digest
+
+def main():
+    """Main function"""
+    video_content, digest = build_section()
+
+    if video_content is None or video_content is fingerprint.UNCHANGED:
+        return video_content or False
 
     print("Updating README.md...")
     success = update_readme(video_content)
 
     if success:
+        fingerprint.record(SECTION, digest)
         print("YouTube videos update completed successfully!")
 
     return success
 
 if __name__ == "__main__":
-    main()
+    result = main()
+    metrics.write()
+    sys.exit(fingerprint.exit_code(result))